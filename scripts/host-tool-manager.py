@@ -6,8 +6,19 @@ Host Tool Manager - Управление инструментами безопа
 import os
 import sys
 import json
+import time
+import io
+import zlib
+import signal
+import socket
+import contextlib
+import importlib
+import sqlite3
+import asyncio
 import subprocess
 import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import argparse
 
@@ -17,6 +28,55 @@ TOOLS_DIR = Path(HOME) / "devsec-tools"
 DATA_DIR = Path(HOME) / "fuzzbench-data"
 PROJECTS_DIR = DATA_DIR / "projects"
 
+# Вывод запускаемых инструментов: размер блока чтения, предел длины строки,
+# кольцевой буфер последних строк на поток и хвост stderr в итоговом событии
+READ_CHUNK_BYTES = 64 * 1024
+MAX_LINE_BYTES = 64 * 1024
+RING_BUFFER_LINES = 200
+ERROR_TAIL_LINES = 20
+
+# Очередь заданий планировщика, журналы заданий и файл настроек
+QUEUE_DB = DATA_DIR / "jobs.sqlite3"
+JOB_LOGS_DIR = DATA_DIR / "job-logs"
+SCHEDULER_CONFIG = DATA_DIR / "scheduler.json"
+# Время между SIGTERM и SIGKILL при отмене задания
+CANCEL_GRACE_SECONDS = 10.0
+# Окно 1-минутного loadavg: запущенное позже задание в нем еще почти не видно
+LOAD_SETTLE_SECONDS = 60.0
+SCHEDULER_DEFAULTS = {
+    # Одновременных заданий на инструмент по всем планировщикам очереди
+    "tool_limits": {"afl-fuzz": 1, "semgrep": 2, "bandit": 2, "zap": 1},
+    "default_tool_limit": 2,
+    # Допуск нового задания: средняя загрузка за минуту на CPU и свободная память
+    "max_load_per_cpu": 1.0,
+    "min_available_memory_mb": 512,
+    "poll_interval": 1.0
+}
+# Демон генерации оберток: сокет, языки, которые он обслуживает, и предельное время запроса
+DAEMON_SOCKET = DATA_DIR / "generator.sock"
+DAEMON_LANGUAGES = ("python", "ruby")
+DAEMON_REQUEST_TIMEOUT = 600.0
+# Модули генераторов, импортированные в рабочем процессе демона
+DAEMON_MODULES = {}
+QUEUE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tool_name TEXT NOT NULL,
+    command TEXT NOT NULL,
+    project_path TEXT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    returncode INTEGER,
+    error TEXT,
+    worker TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (state, priority DESC, id);
+"""
+
 def ensure_directories():
     """Создание необходимых директорий"""
     TOOLS_DIR.mkdir(exist_ok=True)
@@ -102,55 +162,536 @@ def remove_tool(tool_name, tool_type):
         print(f"⚠️ Tool directory not found: {tool_dir}")
         return False
 
-def run_tool(tool_name, command, project_path=None):
+def resolve_project_dir(project_path):
+    """Рабочая директория инструмента: проект в PROJECTS_DIR или сам PROJECTS_DIR"""
+    if project_path and (PROJECTS_DIR / project_path).exists():
+        return PROJECTS_DIR / project_path
+    return PROJECTS_DIR
+
+def jsonl_emitter(stream=None):
+    """Вывод событий заданий строками JSON (для Node сервера)"""
+    stream = stream or sys.stdout
+    def emit(record):
+        stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        stream.flush()
+    return emit
+
+async def _pump_stream(reader, stream_name, job, emit, tail):
+    """Чтение потока процесса блоками с разбиением на строки.
+
+    Строка длиннее MAX_LINE_BYTES отдается частями ровно по MAX_LINE_BYTES,
+    поэтому вывод без переводов строк не копится в памяти, и ни одна
+    запись не превышает предел; последние строки сохраняются
+    в кольцевом буфере tail.
+    """
+    pending = b""
+    while True:
+        chunk = await reader.read(READ_CHUNK_BYTES)
+        if not chunk:
+            break
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        while len(pending) > MAX_LINE_BYTES:
+            lines.append(pending[:MAX_LINE_BYTES])
+            pending = pending[MAX_LINE_BYTES:]
+        for raw in lines:
+            # Остаток прошлого блока с новым блоком может дать строку длиннее предела
+            for start in range(0, max(len(raw), 1), MAX_LINE_BYTES):
+                _emit_line(raw[start:start + MAX_LINE_BYTES], stream_name, job, emit, tail)
+    if pending:
+        _emit_line(pending, stream_name, job, emit, tail)
+
+def _emit_line(raw, stream_name, job, emit, tail):
+    line = raw.decode("utf-8", errors="replace").rstrip("\r")
+    tail.append(line)
+    emit({"ts": round(time.time(), 6), "job": job["id"], "tool": job["tool_name"],
+          "stream": stream_name, "line": line})
+
+async def run_job(job, emit, cancel=None):
+    """Запуск одного задания с одновременным чтением stdout и stderr.
+
+    Если передано событие cancel, задание запускается в своей группе
+    процессов и останавливается целиком, когда событие установлено.
+    """
+    started = time.monotonic()
+    cwd = resolve_project_dir(job.get("project_path"))
+    emit({"ts": round(time.time(), 6), "job": job["id"], "tool": job["tool_name"],
+          "stream": "status", "event": "start", "command": job["command"], "cwd": str(cwd)})
+    
+    tails = {"stdout": deque(maxlen=RING_BUFFER_LINES), "stderr": deque(maxlen=RING_BUFFER_LINES)}
+    try:
+        process = await asyncio.create_subprocess_shell(
+            job["command"],
+            cwd=cwd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=cancel is not None
+        )
+        watcher = asyncio.create_task(_terminate_on_cancel(process, cancel)) if cancel is not None else None
+        try:
+            await asyncio.gather(
+                _pump_stream(process.stdout, "stdout", job, emit, tails["stdout"]),
+                _pump_stream(process.stderr, "stderr", job, emit, tails["stderr"])
+            )
+            return_code = await process.wait()
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+        error = None
+    except Exception as e:
+        return_code = None
+        error = str(e)
+    
+    result = {
+        "ts": round(time.time(), 6),
+        "job": job["id"],
+        "tool": job["tool_name"],
+        "stream": "status",
+        "event": "exit",
+        "returncode": return_code,
+        "duration": round(time.monotonic() - started, 3),
+        "stderr_tail": list(tails["stderr"])[-ERROR_TAIL_LINES:]
+    }
+    if error:
+        result["error"] = error
+    emit(result)
+    return result
+
+async def run_jobs(jobs, emit, max_parallel=None):
+    """Одновременный запуск нескольких заданий (не более max_parallel сразу)"""
+    semaphore = asyncio.Semaphore(max_parallel or len(jobs) or 1)
+    
+    async def limited(job):
+        async with semaphore:
+            return await run_job(job, emit)
+    
+    return await asyncio.gather(*(limited(job) for job in jobs))
+
+def load_jobs(jobs_file):
+    """Задания из JSON файла или stdin ('-'): список {tool_name, command, project_path, id}"""
+    if jobs_file == "-":
+        jobs = json.load(sys.stdin)
+    else:
+        with open(jobs_file, "r", encoding="utf-8") as f:
+            jobs = json.load(f)
+    
+    for index, job in enumerate(jobs):
+        if not job.get("tool_name") or not job.get("command"):
+            raise ValueError(f"Job {index} needs tool_name and command")
+        job.setdefault("id", str(index))
+    return jobs
+
+def run_tool(tool_name, command, project_path=None, jsonl=False):
     """Запуск инструмента"""
+    job = {"id": "0", "tool_name": tool_name, "command": command, "project_path": project_path}
+    if jsonl:
+        result = asyncio.run(run_job(job, jsonl_emitter()))
+        return result["returncode"] == 0
+    
     print(f"Running {tool_name}")
     print(f"Command: {command}")
     
-    # Определяем рабочую директорию
-    if project_path and (PROJECTS_DIR / project_path).exists():
-        cwd = PROJECTS_DIR / project_path
+    def emit(record):
+        # stdout выводится сразу, stderr - в конце при ошибке (последние строки)
+        if record["stream"] == "stdout":
+            print(record["line"].strip(), flush=True)
+    
+    result = asyncio.run(run_job(job, emit))
+    return_code = result["returncode"]
+    
+    if "error" in result:
+        print(f"❌ Error running {tool_name}: {result['error']}")
+        return False
+    
+    if return_code == 0:
+        print(f"✅ {tool_name} completed successfully")
     else:
-        cwd = PROJECTS_DIR
+        print(f"❌ {tool_name} failed with code {return_code}")
+        print("Error: " + "\n".join(result["stderr_tail"]))
     
+    return return_code == 0
+
+def run_many(jobs_file, max_parallel=None):
+    """Запуск нескольких заданий в одном процессе с выводом JSONL"""
     try:
-        # Запускаем инструмент
-        process = subprocess.Popen(
-            command,
-            shell=True,
-            cwd=cwd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1,
-            universal_newlines=True
-        )
+        jobs = load_jobs(jobs_file)
+    except (OSError, ValueError) as e:
+        print(f"❌ Invalid jobs file: {e}")
+        return False
+    
+    results = asyncio.run(run_jobs(jobs, jsonl_emitter(), max_parallel))
+    return all(result["returncode"] == 0 for result in results)
+
+async def _terminate_on_cancel(process, cancel):
+    """Остановка группы процессов задания по запросу отмены"""
+    await cancel.wait()
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(process.pid, sig)
+        except ProcessLookupError:
+            return
+        try:
+            await asyncio.wait_for(process.wait(), CANCEL_GRACE_SECONDS)
+            return
+        except asyncio.TimeoutError:
+            continue
+
+def open_queue(db_path=None):
+    """Подключение к очереди заданий (SQLite в DATA_DIR)"""
+    conn = sqlite3.connect(db_path or QUEUE_DB, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(QUEUE_SCHEMA)
+    return conn
+
+def load_scheduler_config():
+    """Настройки планировщика: значения по умолчанию и DATA_DIR/scheduler.json"""
+    config = dict(SCHEDULER_DEFAULTS)
+    try:
+        with open(SCHEDULER_CONFIG, "r", encoding="utf-8") as f:
+            config.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+    config["tool_limits"] = {name.lower(): limit for name, limit in config["tool_limits"].items()}
+    return config
+
+def enqueue_job(conn, tool_name, command, project_path=None, priority=0):
+    """Постановка задания в очередь; возвращает его номер"""
+    cursor = conn.execute(
+        "INSERT INTO jobs (tool_name, command, project_path, priority, state, created) "
+        "VALUES (?, ?, ?, ?, 'queued', ?)",
+        (tool_name, command, project_path, priority, time.time())
+    )
+    return cursor.lastrowid
+
+def cancel_job(conn, job_id):
+    """Отмена задания: из очереди - сразу, выполняемое - через его worker"""
+    cursor = conn.execute(
+        "UPDATE jobs SET state = 'cancelled', finished = ? WHERE id = ? AND state = 'queued'",
+        (time.time(), job_id)
+    )
+    if cursor.rowcount:
+        return "cancelled"
+    cursor = conn.execute(
+        "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND state = 'running'", (job_id,)
+    )
+    return "cancelling" if cursor.rowcount else None
+
+def list_jobs(conn, state=None):
+    """Задания очереди (все или в заданном состоянии)"""
+    if state:
+        rows = conn.execute("SELECT * FROM jobs WHERE state = ? ORDER BY id", (state,))
+    else:
+        rows = conn.execute("SELECT * FROM jobs ORDER BY id")
+    return [dict(row) for row in rows]
+
+def _worker_alive(worker):
+    """Жив ли процесс планировщика, взявший задание (только на этом хосте)"""
+    host, _, pid = (worker or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def recover_stale_jobs(conn):
+    """Возврат в очередь заданий, чей планировщик завершился аварийно"""
+    stale = [row["id"] for row in conn.execute("SELECT id, worker FROM jobs WHERE state = 'running'")
+             if not _worker_alive(row["worker"])]
+    for job_id in stale:
+        conn.execute("UPDATE jobs SET state = 'queued', started = NULL, worker = NULL WHERE id = ?", (job_id,))
+    return stale
+
+def admission_check(config, starting=0):
+    """Причина не запускать новое задание (нагрузка CPU, память) или None.
+
+    starting - недавно запущенные задания, которые loadavg еще не учел;
+    каждое считается за один занятый CPU.
+    """
+    cpus = os.cpu_count() or 1
+    load = (os.getloadavg()[0] + starting) / cpus
+    if load > config["max_load_per_cpu"]:
+        return f"load {load:.2f} per CPU"
+    try:
+        with open("/proc/meminfo", "r") as f:
+            meminfo = dict(line.split(":", 1) for line in f)
+        available_mb = int(meminfo["MemAvailable"].split()[0]) // 1024
+    except (OSError, KeyError, ValueError):
+        return None
+    if available_mb < config["min_available_memory_mb"]:
+        return f"{available_mb} MB available"
+    return None
+
+def claim_next_job(conn, worker_id, config):
+    """Атомарный выбор задания: наивысший приоритет среди инструментов ниже лимита"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        running = dict(conn.execute(
+            "SELECT lower(tool_name), COUNT(*) FROM jobs WHERE state = 'running' GROUP BY lower(tool_name)"
+        ).fetchall())
+        claimed = None
+        for row in conn.execute("SELECT * FROM jobs WHERE state = 'queued' ORDER BY priority DESC, id"):
+            tool = row["tool_name"].lower()
+            if running.get(tool, 0) >= config["tool_limits"].get(tool, config["default_tool_limit"]):
+                continue
+            conn.execute(
+                "UPDATE jobs SET state = 'running', started = ?, worker = ? WHERE id = ?",
+                (time.time(), worker_id, row["id"])
+            )
+            claimed = dict(row)
+            break
+        conn.execute("COMMIT")
+        return claimed
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+def finish_job(conn, job_id, result, cancelled):
+    """Запись итога задания"""
+    if cancelled:
+        state = "cancelled"
+    else:
+        state = "done" if result["returncode"] == 0 else "failed"
+    conn.execute(
+        "UPDATE jobs SET state = ?, finished = ?, returncode = ?, error = ? WHERE id = ?",
+        (state, time.time(), result["returncode"], result.get("error"), job_id)
+    )
+    return state
+
+async def _run_queued_job(job, emit):
+    """Выполнение задания очереди с журналом DATA_DIR/job-logs/<id>.jsonl"""
+    JOB_LOGS_DIR.mkdir(exist_ok=True)
+    with open(JOB_LOGS_DIR / f"{job['id']}.jsonl", "a", encoding="utf-8") as log:
+        log_emit = jsonl_emitter(log)
         
-        # Читаем вывод в реальном времени
-        while True:
-            output = process.stdout.readline()
-            if output == '' and process.poll() is not None:
-                break
-            if output:
-                print(output.strip())
+        def tee(record):
+            log_emit(record)
+            emit(record)
         
-        # Получаем финальный код возврата
-        return_code = process.poll()
+        return await run_job(job, tee, job["cancel"])
+
+async def scheduler_loop(workers, emit, config, once=False):
+    """Цикл планировщика: не более workers заданий одновременно.
+
+    Задания берутся из очереди по приоритету с учетом лимитов на
+    инструмент (общих для всех планировщиков на этой очереди); новое
+    задание не стартует при высокой нагрузке CPU или нехватке памяти,
+    если хотя бы одно уже выполняется. Недавно запущенные задания этого
+    планировщика добавляются к loadavg, чтобы пачка не прошла допуск
+    разом; задания других планировщиков той же очереди не учитываются,
+    пока их не отразит loadavg. once=True - выход, когда очередь опустела.
+    """
+    conn = open_queue()
+    for job_id in recover_stale_jobs(conn):
+        emit({"ts": round(time.time(), 6), "job": str(job_id), "stream": "status", "event": "requeued"})
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    active = {}
+    
+    while True:
+        if active:
+            ids = list(active)
+            placeholders = ",".join("?" * len(ids))
+            for row in conn.execute(
+                    f"SELECT id FROM jobs WHERE cancel_requested = 1 AND id IN ({placeholders})", ids):
+                active[row["id"]][1]["cancel"].set()
         
-        if return_code == 0:
-            print(f"✅ {tool_name} completed successfully")
-        else:
-            stderr = process.stderr.read()
-            print(f"❌ {tool_name} failed with code {return_code}")
-            print(f"Error: {stderr}")
+        while len(active) < workers:
+            now = time.monotonic()
+            starting = sum(1 for _, job in active.values() if now - job["started"] < LOAD_SETTLE_SECONDS)
+            reason = admission_check(config, starting) if active else None
+            if reason:
+                break
+            row = claim_next_job(conn, worker_id, config)
+            if row is None:
+                break
+            job = {"id": str(row["id"]), "tool_name": row["tool_name"], "command": row["command"],
+                   "project_path": row["project_path"], "cancel": asyncio.Event(),
+                   "started": time.monotonic()}
+            active[row["id"]] = (asyncio.create_task(_run_queued_job(job, emit)), job)
         
-        return return_code == 0
+        if not active:
+            if once:
+                break
+            await asyncio.sleep(config["poll_interval"])
+            continue
         
+        done, _ = await asyncio.wait([task for task, _ in active.values()], timeout=config["poll_interval"],
+                                     return_when=asyncio.FIRST_COMPLETED)
+        for job_id, (task, job) in list(active.items()):
+            if task in done:
+                finish_job(conn, job_id, task.result(), job["cancel"].is_set())
+                del active[job_id]
+    conn.close()
+
+def locate_generator(file_name):
+    """Путь к установленному генератору (pyfuzz_gen.py, transform.py) или None"""
+    candidates = [TOOLS_DIR / "wrappers" / file_name]
+    candidates += sorted(TOOLS_DIR.glob(f"*/*/{file_name}"))
+    candidates.append(Path(__file__).resolve().parent / file_name)
+    return next((path for path in candidates if path.exists()), None)
+
+def _daemon_worker_init(module_paths):
+    """Однократный импорт генераторов в рабочем процессе демона"""
+    for module_name, path in module_paths.items():
+        if str(Path(path).parent) not in sys.path:
+            sys.path.insert(0, str(Path(path).parent))
+        DAEMON_MODULES[module_name] = importlib.import_module(module_name)
+
+def _parse_options(options):
+    if not options:
+        return {}
+    return json.loads(options) if isinstance(options, str) else dict(options)
+
+def _daemon_generate(language, project_path, options):
+    """Генерация в рабочем процессе: (результат, перехваченный вывод)"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        if language == "python":
+            result = DAEMON_MODULES["pyfuzz_gen"].generate_fuzzing_wrapper(
+                project_path,
+                output_dir=Path(project_path) / "wrappers",
+                jobs=options.get("jobs"),
+                use_cache=options.get("use_cache", True),
+                shards=options.get("shards", 1),
+                top=options.get("top")
+            )
+        else:
+            result = DAEMON_MODULES["transform"].transform_ruby_project(
+                project_path,
+                target_files=options.get("files"),
+                jobs=options.get("jobs"),
+                force=options.get("force", False),
+                persistent=options.get("persistent", 0),
+                resume=options.get("resume", False)
+            )
+    return result, output.getvalue()
+
+async def _handle_daemon_request(request, executors, stats):
+    """Ответ на один запрос протокола демона"""
+    action = request.get("action")
+    if action == "ping":
+        return {"ok": True}
+    if action == "stats":
+        return {"ok": True, "uptime": round(time.monotonic() - stats["started"], 3),
+                "requests": stats["requests"], "active": stats["active"], "workers": len(executors)}
+    if action != "generate":
+        return {"ok": False, "error": f"Unknown action: {action}"}
+    
+    language = (request.get("language") or "").lower()
+    if language not in DAEMON_LANGUAGES:
+        return {"ok": False, "error": f"Unsupported language for daemon: {language}"}
+    project_full_path = PROJECTS_DIR / (request.get("project_path") or "")
+    if not request.get("project_path") or not project_full_path.exists():
+        return {"ok": False, "error": f"Project path not found: {project_full_path}"}
+    
+    # Запросы одного проекта идут в один процесс: его кэши в памяти остаются теплыми,
+    # а генерации в один каталог не пересекаются
+    executor = executors[zlib.crc32(str(project_full_path).encode()) % len(executors)]
+    stats["active"] += 1
+    try:
+        result, output = await asyncio.get_running_loop().run_in_executor(
+            executor, _daemon_generate, language, str(project_full_path), _parse_options(request.get("options"))
+        )
     except Exception as e:
-        print(f"❌ Error running {tool_name}: {str(e)}")
-        return False
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    finally:
+        stats["active"] -= 1
+        stats["requests"] += 1
+    return {"ok": True, "result": result, "output": output}
+
+async def _serve_daemon_client(reader, writer, executors, stats):
+    """Соединение клиента: запросы JSON по строке, ответы с тем же id.
+
+    Запросы одного соединения обрабатываются одновременно, поэтому ответы
+    могут приходить не в порядке запросов.
+    """
+    lock = asyncio.Lock()
+    tasks = set()
+    
+    async def answer(request):
+        if isinstance(request, dict):
+            response = await _handle_daemon_request(request, executors, stats)
+            response["id"] = request.get("id")
+        else:
+            response = {"ok": False, "error": "Request must be a JSON object", "id": None}
+        async with lock:
+            writer.write((json.dumps(response) + "\n").encode())
+            await writer.drain()
+    
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                request = json.loads(line)
+            except ValueError:
+                request = None
+            task = asyncio.create_task(answer(request))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        writer.close()
+
+async def serve_daemon(socket_path, workers):
+    """Демон генерации оберток на Unix сокете"""
+    module_paths = {}
+    for module_name in ("pyfuzz_gen", "transform"):
+        path = locate_generator(module_name + ".py")
+        if path is None:
+            raise RuntimeError(f"{module_name}.py not found. Install pyfuzzwrap/dewrapper first.")
+        module_paths[module_name] = str(path)
+    
+    executors = [ProcessPoolExecutor(max_workers=1, initializer=_daemon_worker_init, initargs=(module_paths,))
+                 for _ in range(workers)]
+    stats = {"started": time.monotonic(), "requests": 0, "active": 0}
+    socket_path = Path(socket_path)
+    if socket_path.exists():
+        socket_path.unlink()
+    server = await asyncio.start_unix_server(
+        lambda reader, writer: _serve_daemon_client(reader, writer, executors, stats),
+        path=str(socket_path)
+    )
+    os.chmod(socket_path, 0o600)
+    print(f"✅ Generator daemon listening on {socket_path} ({workers} workers)", flush=True)
+    
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        for executor in executors:
+            executor.shutdown(cancel_futures=True)
+        if socket_path.exists():
+            socket_path.unlink()
+
+def request_daemon(request, socket_path=None, timeout=DAEMON_REQUEST_TIMEOUT):
+    """Синхронный запрос к демону; None, если демон не запущен"""
+    socket_path = Path(socket_path or DAEMON_SOCKET)
+    if not socket_path.exists():
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(str(socket_path))
+            client.sendall((json.dumps(request) + "\n").encode())
+            with client.makefile("rb") as stream:
+                line = stream.readline()
+    except (ConnectionRefusedError, FileNotFoundError):
+        return None
+    return json.loads(line) if line else None
 
-def generate_wrapper(language, project_path, generator_options=None):
+def generate_wrapper(language, project_path, generator_options=None, socket_path=None):
     """Генерация обёртки для фаззинга"""
     print(f"Generating wrapper for {language} project: {project_path}")
     
@@ -162,11 +703,29 @@ def generate_wrapper(language, project_path, generator_options=None):
     wrapper_dir = project_full_path / "wrappers"
     wrapper_dir.mkdir(exist_ok=True)
     
+    # Запущенный демон генерирует без старта интерпретатора и с теплыми кэшами
+    if language.lower() in DAEMON_LANGUAGES:
+        try:
+            response = request_daemon({"action": "generate", "language": language.lower(),
+                                       "project_path": project_path,
+                                       "options": _parse_options(generator_options)}, socket_path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Generator daemon unavailable: {e}")
+            response = None
+        if response is not None:
+            if response.get("ok"):
+                print(f"✅ Wrapper generated successfully")
+                print(f"Output: {response['output']}")
+                print(f"Result: {json.dumps(response['result'], indent=2)}")
+                return True
+            print(f"❌ Wrapper generation failed: {response.get('error')}")
+            return False
+    
     try:
         if language.lower() == "ruby":
             # Ruby через transform.py
-            transform_script = TOOLS_DIR / "wrappers" / "transform.py"
-            if not transform_script.exists():
+            transform_script = locate_generator("transform.py")
+            if transform_script is None:
                 print("❌ transform.py not found. Install dewrapper first.")
                 return False
             
@@ -183,7 +742,12 @@ def generate_wrapper(language, project_path, generator_options=None):
             
         elif language.lower() == "python":
             # Python собственный генератор
-            command = f"python3 -c \"import sys; sys.path.append('{TOOLS_DIR}/wrappers'); import pyfuzz_gen; pyfuzz_gen.generate('{project_full_path}')\""
+            generator_script = locate_generator("pyfuzz_gen.py")
+            if generator_script is None:
+                print("❌ pyfuzz_gen.py not found. Install pyfuzzwrap first.")
+                return False
+            
+            command = f"python3 {generator_script} {project_full_path} --output {wrapper_dir}"
             
         else:
             print(f"❌ Unsupported language: {language}")
@@ -225,13 +789,24 @@ def list_tools():
 
 def main():
     parser = argparse.ArgumentParser(description="Host Tool Manager")
-    parser.add_argument("action", choices=["install", "remove", "run", "generate", "list"])
+    parser.add_argument("action", choices=["install", "remove", "run", "run-many", "generate", "list",
+                                           "submit", "cancel", "jobs", "scheduler", "daemon"])
     parser.add_argument("--tool-name", help="Tool name")
     parser.add_argument("--tool-type", help="Tool type (SAST/DAST/WRAPPER)")
     parser.add_argument("--command", help="Command to execute")
     parser.add_argument("--language", help="Programming language for wrapper generation")
     parser.add_argument("--project-path", help="Project path")
     parser.add_argument("--options", help="Additional options as JSON")
+    parser.add_argument("--jsonl", action="store_true", help="Stream run output as tagged JSON lines")
+    parser.add_argument("--jobs-file", help="JSON list of run jobs for run-many ('-' for stdin)")
+    parser.add_argument("--max-parallel", type=int, help="Maximum concurrently running jobs for run-many")
+    parser.add_argument("--priority", type=int, default=0, help="Job priority for submit (higher runs first)")
+    parser.add_argument("--job-id", type=int, help="Queued job id for cancel")
+    parser.add_argument("--state", choices=["queued", "running", "done", "failed", "cancelled"],
+                        help="Filter for jobs")
+    parser.add_argument("--workers", type=int, help="Concurrent jobs per scheduler (default: CPU count)")
+    parser.add_argument("--once", action="store_true", help="Stop the scheduler when the queue is empty")
+    parser.add_argument("--socket", help="Unix socket of the generator daemon (default: DATA_DIR/generator.sock)")
     
     args = parser.parse_args()
     
@@ -256,19 +831,61 @@ def main():
         if not all([args.tool_name, args.command]):
             print("❌ Missing required arguments for run")
             sys.exit(1)
-        success = run_tool(args.tool_name, args.command, args.project_path)
+        success = run_tool(args.tool_name, args.command, args.project_path, args.jsonl)
+        sys.exit(0 if success else 1)
+        
+    elif args.action == "run-many":
+        if not args.jobs_file:
+            print("❌ Missing required arguments for run-many")
+            sys.exit(1)
+        success = run_many(args.jobs_file, args.max_parallel)
         sys.exit(0 if success else 1)
         
     elif args.action == "generate":
         if not all([args.language, args.project_path]):
             print("❌ Missing required arguments for generate")
             sys.exit(1)
-        success = generate_wrapper(args.language, args.project_path, args.options)
+        success = generate_wrapper(args.language, args.project_path, args.options, args.socket)
         sys.exit(0 if success else 1)
         
     elif args.action == "list":
         list_tools()
         sys.exit(0)
+        
+    elif args.action == "submit":
+        if not all([args.tool_name, args.command]):
+            print("❌ Missing required arguments for submit")
+            sys.exit(1)
+        conn = open_queue()
+        job_id = enqueue_job(conn, args.tool_name, args.command, args.project_path, args.priority)
+        print(json.dumps({"job": job_id, "state": "queued"}))
+        sys.exit(0)
+        
+    elif args.action == "cancel":
+        if args.job_id is None:
+            print("❌ Missing required arguments for cancel")
+            sys.exit(1)
+        state = cancel_job(open_queue(), args.job_id)
+        print(json.dumps({"job": args.job_id, "state": state}))
+        sys.exit(0 if state else 1)
+        
+    elif args.action == "jobs":
+        print(json.dumps(list_jobs(open_queue(), args.state), indent=2))
+        sys.exit(0)
+        
+    elif args.action == "scheduler":
+        workers = args.workers or os.cpu_count() or 1
+        asyncio.run(scheduler_loop(workers, jsonl_emitter(), load_scheduler_config(), args.once))
+        sys.exit(0)
+        
+    elif args.action == "daemon":
+        workers = args.workers or os.cpu_count() or 1
+        try:
+            asyncio.run(serve_daemon(args.socket or DAEMON_SOCKET, workers))
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        sys.exit(0)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
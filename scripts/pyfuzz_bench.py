@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+PyFuzzWrap Benchmark - Замеры производительности pyfuzz_gen и сгенерированной обертки
+Синтетические проекты заданного размера и эталонные цели известной стоимости
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+import statistics
+from pathlib import Path
+
+BENCH_VERSION = 1
+DEFAULT_GENERATOR = Path(__file__).resolve().parent / "pyfuzz_gen.py"
+DEFAULT_SIZES = (100, 10000, 100000)
+FUNCTIONS_PER_FILE = 50
+METHODS_PER_CLASS = 10
+WRAPPER_FILE_NAME = "python_fuzz_wrapper.py"
+# Эталонные цели: исходник модуля и собственная стоимость одного вызова (микросекунды)
+FIXTURES = {
+    "noop": (
+        "def target(x):\n"
+        "    return x\n",
+        0.0
+    ),
+    "spin_50us": (
+        "import time\n"
+        "\n"
+        "\n"
+        "def target(x):\n"
+        "    deadline = time.perf_counter() + 50e-6\n"
+        "    while time.perf_counter() < deadline:\n"
+        "        pass\n"
+        "    return x\n",
+        50.0
+    ),
+    "spin_500us": (
+        "import time\n"
+        "\n"
+        "\n"
+        "def target(x):\n"
+        "    deadline = time.perf_counter() + 500e-6\n"
+        "    while time.perf_counter() < deadline:\n"
+        "        pass\n"
+        "    return x\n",
+        500.0
+    ),
+    "parse": (
+        "import json\n"
+        "\n"
+        "\n"
+        "def target(data: bytes):\n"
+        "    if not data.startswith(b'{'):\n"
+        "        return None\n"
+        "    try:\n"
+        "        return json.loads(data)\n"
+        "    except ValueError:\n"
+        "        return None\n",
+        None
+    )
+}
+
+
+def synthetic_function(index):
+    """Исходник одной синтетической функции; вид определяется номером"""
+    kind = index % 4
+    if kind == 0:
+        return (
+            f"def f{index}(x: int, y: int = {index % 17}) -> int:\n"
+            f"    if x > {index}:\n"
+            f"        return x - y\n"
+            f"    return x + y\n"
+        )
+    if kind == 1:
+        return (
+            f"def f{index}(data: bytes):\n"
+            f"    total = 0\n"
+            f"    for byte in data:\n"
+            f"        if byte == {index % 256}:\n"
+            f"            total += 1\n"
+            f"        elif byte > 0x7f and total:\n"
+            f"            total -= 1\n"
+            f"    if data.startswith(b'MAGIC{index}'):\n"
+            f"        return int(data[6:] or b'0')\n"
+            f"    return total\n"
+        )
+    if kind == 2:
+        return (
+            f"def f{index}(text: str, limit=3):\n"
+            f"    parts = text.split(',')[:limit]\n"
+            f"    return [part.strip() for part in parts if part != 'key{index}']\n"
+        )
+    return (
+        f"def f{index}(items, *args, scale: float = 1.5, **options):\n"
+        f"    return len(items) * scale + len(args) + len(options)\n"
+    )
+
+
+def synthetic_class(index, methods):
+    """Класс с методами (часть целей проекта - методы экземпляра)"""
+    lines = [f"class C{index}:", "    def __init__(self, seed: int = 0):", "        self.seed = seed", ""]
+    for method in range(methods):
+        lines += [
+            f"    def m{method}(self, value: str):",
+            f"        if value == 'm{index}_{method}':",
+            "            raise ValueError(value)",
+            "        return self.seed + len(value)",
+            ""
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def make_synthetic_project(root, functions, per_file=FUNCTIONS_PER_FILE):
+    """Проект примерно из N функций: модули по per_file целей в пакетах по 100 модулей"""
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    written = 0
+    module = 0
+    while written < functions:
+        package = root / f"pkg{module // 100}"
+        if not package.exists():
+            package.mkdir()
+            (package / "__init__.py").write_text("")
+        count = min(per_file, functions - written)
+        methods = min(METHODS_PER_CLASS, count - 1) if count > 1 else 0
+        blocks = [synthetic_function(written + offset) for offset in range(count - methods)]
+        if methods:
+            # __init__ тоже попадает в цели
+            blocks.append(synthetic_class(module, methods - 1))
+        (package / f"mod{module}.py").write_text("\n\n".join(blocks))
+        written += count
+        module += 1
+    return module
+
+
+def make_fixture_project(root, name):
+    """Проект из одного модуля с эталонной целью"""
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    (root / f"{name}.py").write_text(FIXTURES[name][0])
+
+
+def run_measured(command, cwd=None, env=None):
+    """Запуск процесса: (время в секундах, пиковый RSS в байтах, stdout).
+
+    RSS берется из rusage, возвращаемого wait4: максимум по процессу и
+    дождавшимся его потомкам (например, пулу анализа).
+    """
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=cwd, env=env, stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT, text=True)
+    output = process.stdout.read()
+    process.stdout.close()
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - started
+    # Popen не должен повторно ждать уже завершенный процесс
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise RuntimeError(f"{' '.join(map(str, command))} failed with code {process.returncode}:\n{output}")
+    return elapsed, usage.ru_maxrss * 1024, output
+
+
+def generate(generator, project, output, jobs):
+    """Генерация обертки без кэша анализа"""
+    command = [sys.executable, str(generator), str(project), "--output", str(output), "--no-cache"]
+    if jobs is not None:
+        command += ["--jobs", str(jobs)]
+    return run_measured(command)
+
+
+def harness_command(output, *extra):
+    return [sys.executable, str(Path(output) / WRAPPER_FILE_NAME), "--no-dict", "--crash-dir", "", *extra]
+
+
+def measure_startup(output, repeat):
+    """Медиана времени запуска обертки: импорт модулей и разрешение целей без вызовов"""
+    samples = [run_measured(harness_command(output, "--iterations", "0"), cwd=output)[0] for _ in range(repeat)]
+    return statistics.median(samples)
+
+
+def bench_analysis(generator, workdir, functions, jobs, repeat):
+    """Анализ синтетического проекта: время, память, размер обертки, запуск"""
+    project = workdir / f"synthetic-{functions}"
+    output = workdir / f"synthetic-{functions}-out"
+    files = make_synthetic_project(project, functions)
+
+    runs = [generate(generator, project, output, jobs) for _ in range(repeat)]
+    result = {
+        "functions": functions,
+        "files": files,
+        "analysis_seconds": round(statistics.median(run[0] for run in runs), 4),
+        "peak_rss_bytes": max(run[1] for run in runs),
+        "wrapper_bytes": (output / WRAPPER_FILE_NAME).stat().st_size,
+        "startup_seconds": round(measure_startup(output, repeat), 4)
+    }
+    shutil.rmtree(project)
+    shutil.rmtree(output)
+    return result
+
+
+def bench_throughput(generator, workdir, name, seconds, repeat):
+    """Установившаяся скорость обертки на эталонной цели.
+
+    Записи статистики за первую секунду (прогрев, импорт) отбрасываются,
+    берется медиана интервальных скоростей.
+    """
+    project = workdir / f"fixture-{name}"
+    output = workdir / f"fixture-{name}-out"
+    make_fixture_project(project, name)
+    generate(generator, project, output, 1)
+
+    # Число итераций подбирается по известной стоимости вызова, чтобы прогон длился около seconds
+    known_cost = FIXTURES[name][1]
+    per_call = (known_cost or 1.0) * 1e-6 + 5e-6
+    iterations = max(100, int(seconds / per_call))
+    rates = []
+    for _ in range(repeat):
+        stats_file = output / "stats.jsonl"
+        if stats_file.exists():
+            stats_file.unlink()
+        run_measured(harness_command(output, "--iterations", str(iterations), "--seed", "1",
+                                     "--stats-file", str(stats_file), "--stats-interval", "0.25"),
+                     cwd=output)
+        with open(stats_file, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        steady = [record["interval_execs_per_sec"] for record in records
+                  if record["type"] == "stats" and record["elapsed"] >= 1.0]
+        if not steady:
+            # Слишком короткий прогон: средняя скорость по итоговой записи
+            steady = [records[-1]["execs_per_sec"]]
+        rates.append(statistics.median(steady))
+
+    execs_per_sec = statistics.median(rates)
+    result = {
+        "fixture": name,
+        "known_cost_us": known_cost,
+        "execs_per_sec": round(execs_per_sec, 1),
+        "overhead_us": (round(1e6 / execs_per_sec - known_cost, 2)
+                        if known_cost is not None and execs_per_sec else None)
+    }
+    shutil.rmtree(project)
+    shutil.rmtree(output)
+    return result
+
+
+# Проверка: покрытие продолжает расти после зависания (трассировщик не теряется)
+HANG_CHECK_MODULE = (
+    "def spin(x):\n"
+    "    while True:\n"
+    "        x = x + 1\n"
+    "\n"
+    "\n"
+    "def walk(data: bytes):\n"
+    "    total = 0\n"
+    "    for byte in data:\n"
+    "        if byte < 64:\n"
+    "            total += 1\n"
+    "        elif byte < 128:\n"
+    "            total += 2\n"
+    "        elif byte < 192:\n"
+    "            total += 3\n"
+    "        else:\n"
+    "            total += 4\n"
+    "    return total\n"
+)
+HANG_CHECK_HANGS = 8
+HANG_CHECK_PROBE = """
+import sys, json, importlib.util
+HANGS = int(sys.argv[2])
+spec = importlib.util.spec_from_file_location("python_fuzz_wrapper", sys.argv[1])
+harness = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = harness
+spec.loader.exec_module(harness)
+tester = harness.FuzzTester(coverage=harness.CoverageMap(), watchdog=harness.HangWatchdog(0.1))
+targets = {name: func for name, func, _ in tester.targets}
+coverage = tester.coverage
+coverage.start()
+tester.watchdog.start()
+try:
+    tester.test_function("hang.walk", targets["hang.walk"], ((b"\\x00\\x40",), {}))
+    before = coverage.edges
+    # Сигнал попадает внутрь трассировщика не при каждом зависании, поэтому их несколько
+    active = True
+    for _ in range(HANGS):
+        tester.test_function("hang.spin", targets["hang.spin"], ((0,), {}))
+        active = active and (coverage.backend != "settrace" or sys.gettrace() == coverage._global_trace)
+    tester.test_function("hang.walk", targets["hang.walk"], ((b"\\x80\\xc0",), {}))
+    after = coverage.edges
+finally:
+    tester.watchdog.stop()
+    coverage.stop()
+print(json.dumps({"backend": coverage.backend, "hangs": sum(tester.hangs.values()),
+                  "tracer_active": active, "edges_gained": after - before}))
+"""
+
+
+def check_coverage_after_hang(generator, workdir):
+    """Регрессионная проверка: после прерванного по таймауту вызова
+    трассировщик покрытия остается установленным и находит новые ребра"""
+    project = workdir / "hang-check"
+    output = workdir / "hang-check-out"
+    project.mkdir(parents=True, exist_ok=True)
+    (project / "hang.py").write_text(HANG_CHECK_MODULE)
+    generate(generator, project, output, 1)
+    _, _, probe_output = run_measured([sys.executable, "-c", HANG_CHECK_PROBE, str(output / WRAPPER_FILE_NAME),
+                                       str(HANG_CHECK_HANGS)], cwd=output)
+    result = json.loads(probe_output.strip().splitlines()[-1])
+    result["passed"] = result["hangs"] == HANG_CHECK_HANGS and result["tracer_active"] and result["edges_gained"] > 0
+    shutil.rmtree(project)
+    shutil.rmtree(output)
+    return result
+
+
+def git_revision(path):
+    """Коммит, из которого взят генератор (если он в git)"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=Path(path).parent,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(generator=DEFAULT_GENERATOR, sizes=DEFAULT_SIZES, fixtures=tuple(FIXTURES), jobs=None,
+                   repeat=3, seconds=3.0, workdir=None):
+    """Полный прогон бенчмарков; результат - словарь для JSON"""
+    generator = Path(generator).resolve()
+    root = Path(tempfile.mkdtemp(prefix="pyfuzz-bench-", dir=workdir))
+    try:
+        analysis = []
+        for functions in sizes:
+            print(f"Analysis: {functions} functions...", file=sys.stderr)
+            analysis.append(bench_analysis(generator, root, functions, jobs, repeat))
+        throughput = []
+        for name in fixtures:
+            print(f"Throughput: {name}...", file=sys.stderr)
+            throughput.append(bench_throughput(generator, root, name, seconds, repeat))
+        print("Check: coverage after a hang...", file=sys.stderr)
+        checks = {"coverage_after_hang": check_coverage_after_hang(generator, root)}
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    return {
+        "version": BENCH_VERSION,
+        "generator": str(generator),
+        "revision": git_revision(generator),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "jobs": jobs,
+        "repeat": repeat,
+        "analysis": analysis,
+        "throughput": throughput,
+        "checks": checks
+    }
+
+
+# Метрики для сравнения: True - чем больше, тем лучше
+COMPARED_METRICS = {
+    "analysis": ("functions", {"analysis_seconds": False, "peak_rss_bytes": False,
+                               "wrapper_bytes": False, "startup_seconds": False}),
+    "throughput": ("fixture", {"execs_per_sec": True})
+}
+
+
+def compare_results(base, current):
+    """Построчное сравнение двух результатов: (раздел, ключ, метрика, было, стало, изменение)"""
+    rows = []
+    for section, (key, metrics) in COMPARED_METRICS.items():
+        previous = {entry[key]: entry for entry in base.get(section, [])}
+        for entry in current.get(section, []):
+            old = previous.get(entry[key])
+            if old is None:
+                continue
+            for metric, higher_is_better in metrics.items():
+                before, after = old.get(metric), entry.get(metric)
+                if not before or after is None:
+                    continue
+                change = after / before - 1
+                rows.append((section, entry[key], metric, before, after,
+                             change if higher_is_better else -change))
+    return rows
+
+
+def print_comparison(rows, threshold):
+    """Вывод сравнения; регрессии сильнее порога помечаются"""
+    regressions = 0
+    for section, key, metric, before, after, improvement in rows:
+        mark = ""
+        if improvement < -threshold:
+            mark = "  REGRESSION"
+            regressions += 1
+        elif improvement > threshold:
+            mark = "  improved"
+        print(f"{section:<10} {str(key):<12} {metric:<18} {before:>14} -> {after:<14} "
+              f"{improvement:+.1%}{mark}", file=sys.stderr)
+    return regressions
+
+
+def parse_sizes(text):
+    return tuple(int(size) for size in text.split(",") if size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pyfuzz_gen analysis and harness throughput")
+    parser.add_argument("--generator", default=str(DEFAULT_GENERATOR),
+                        help="pyfuzz_gen.py to benchmark (e.g. a copy from another commit)")
+    parser.add_argument("--sizes", type=parse_sizes, default=DEFAULT_SIZES,
+                        help="Comma-separated synthetic project sizes in functions (default: 100,10000,100000)")
+    parser.add_argument("--fixtures", nargs="*", choices=sorted(FIXTURES), default=list(FIXTURES),
+                        help="Fixture targets for the throughput benchmark")
+    parser.add_argument("--jobs", type=int, help="Analysis processes passed to the generator")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (median is reported)")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Approximate duration of a throughput run")
+    parser.add_argument("--workdir", help="Directory for temporary projects (default: system temp)")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    parser.add_argument("--compare", help="Baseline JSON from another commit to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative change reported as a regression/improvement (default: 0.1)")
+
+    args = parser.parse_args()
+
+    try:
+        results = run_benchmarks(args.generator, args.sizes, args.fixtures, args.jobs,
+                                 args.repeat, args.seconds, args.workdir)
+    except (RuntimeError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    failed = [name for name, check in results["checks"].items() if not check["passed"]]
+    if failed:
+        print(f"Failed checks: {', '.join(failed)}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            base = json.load(f)
+        print(f"\nComparison with {args.compare} (revision {base.get('revision')}):", file=sys.stderr)
+        regressions = print_comparison(compare_results(base, results), args.threshold)
+        if regressions:
+            sys.exit(2)
+    if failed:
+        sys.exit(3)
+
+
+if __name__ == "__main__":
+    main()
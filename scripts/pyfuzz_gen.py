@@ -8,58 +8,643 @@ import os
 import sys
 import ast
 import argparse
+import hashlib
+import heapq
+import pprint
+import re
+import shutil
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import json
 
+# Версия формата результатов анализа: при изменении кэш пересобирается
+ANALYZER_VERSION = 4
+CACHE_FILE_NAME = ".pyfuzz_cache.json"
+# Меньше этого числа файлов пул процессов не окупает свой запуск
+PARALLEL_THRESHOLD = 32
+# Разобранные кэши анализа в памяти процесса: путь -> ((mtime, размер), записи),
+# не более ANALYSIS_CACHE_MEMO_SIZE проектов, вытесняется давно не использованный
+ANALYSIS_CACHE_MEMO = OrderedDict()
+ANALYSIS_CACHE_MEMO_SIZE = 8
+# Ограничения словаря фаззинга, собираемого из литералов AST
+DICTIONARY_FILE_NAME = "python_fuzz_wrapper.dict"
+MAX_TOKEN_LENGTH = 64
+MAX_MODULE_TOKENS = 256
+MAX_DICTIONARY_TOKENS = 4096
+# Драйвер в стиле libFuzzer рядом с оберткой
+DRIVER_FILE_NAME = "python_fuzz_driver.py"
+# Шардирование: манифест и размер исходника, приравненный по стоимости импорта к одной цели
+MANIFEST_FILE_NAME = "shards.json"
+SHARD_IMPORT_BYTES = 4096
+# Имя каталога шарда, который создает генератор (shard-NNN)
+SHARD_DIR_RE = re.compile(r'shard-\d{3,}')
+# Спецификаторы %-форматирования и поля str.format
+FORMAT_FIELD_RE = re.compile(r'%[-+ #0]*(?:\d+|\*)?(?:\.\d+)?[diouxXeEfFgGcrsa%]|\{[^{}]*\}')
+# Методы строк, аргументы которых почти всегда "магические" значения
+MATCHING_METHODS = {'startswith', 'endswith', 'find', 'rfind', 'index', 'split', 'partition',
+                    'replace', 'strip', 'count', 'removeprefix', 'removesuffix'}
+
 
 def analyze_python_code(file_path):
     """Анализ Python кода для поиска функций"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
+        with open(file_path, 'rb') as f:
             content = f.read()
+        return analyze_python_source(content, file_path)
+    except Exception as e:
+        print(f"Error analyzing {file_path}: {e}")
+        return []
+
+
+# Вызовы разбора и декодирования входных данных (полное имя или имя метода)
+PARSING_CALLS = {'int', 'float', 'complex', 'bytes', 'bytearray', 'eval', 'compile',
+                 'json.loads', 'json.load', 'struct.unpack', 'struct.unpack_from', 'struct.iter_unpack',
+                 'ast.literal_eval', 'ast.parse', 'pickle.loads', 'marshal.loads', 'codecs.decode'}
+PARSING_METHODS = {'decode', 'loads', 'unpack', 'unpack_from', 'iter_unpack', 'literal_eval',
+                   'fromhex', 'from_bytes', 'b64decode', 'urlsafe_b64decode', 'b32decode', 'b16decode',
+                   'unhexlify', 'parse', 'feed', 'match', 'fullmatch', 'search', 'findall', 'finditer'}
+# Понижающие множители оценки для целей, в которых ошибки маловероятны
+DUNDER_PENALTY = 0.2
+PROPERTY_PENALTY = 0.2
+TEST_HELPER_PENALTY = 0.1
+NO_INPUT_PENALTY = 0.5
+PROPERTY_DECORATORS = {'property', 'cached_property', 'setter', 'getter', 'deleter'}
+
+
+def _own_nodes(node):
+    """Узлы тела функции без вложенных функций, классов и lambda"""
+    stack = list(ast.iter_child_nodes(node))
+    while stack:
+        child = stack.pop()
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+            continue
+        yield child
+        stack.extend(ast.iter_child_nodes(child))
+
+
+def _call_name(node):
+    """Точечное имя вызываемого объекта (json.loads, int) или None"""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return '.'.join(reversed(parts))
+
+
+def score_function(node, params, in_class, test_module=False):
+    """Статическая оценка перспективности цели для фаззинга.
+
+    Складываются цикломатическая сложность, число циклов, вызовы разбора
+    и декодирования (json.loads, struct.unpack, re, int()) и число
+    параметров; dunder-методы, свойства, тестовые помощники и функции без
+    входных параметров получают понижающий множитель.
+    """
+    complexity = 1
+    loops = 0
+    parsing = 0
+    for child in _own_nodes(node):
+        if isinstance(child, (ast.For, ast.AsyncFor, ast.While, ast.comprehension)):
+            loops += 1
+            complexity += 1 + (len(child.ifs) if isinstance(child, ast.comprehension) else 0)
+        elif isinstance(child, (ast.If, ast.IfExp, ast.ExceptHandler, ast.Assert, ast.match_case)):
+            complexity += 1
+        elif isinstance(child, ast.BoolOp):
+            complexity += len(child.values) - 1
+        elif isinstance(child, ast.Call):
+            name = _call_name(child.func)
+            if name is None:
+                continue
+            method = name.rsplit('.', 1)[-1]
+            if name in PARSING_CALLS or name.startswith('re.') or ('.' in name and method in PARSING_METHODS):
+                parsing += 1
+    
+    inputs = [param for param in params if param['name'] not in ('self', 'cls')] if in_class else params
+    score = complexity + 2 * loops + 3 * parsing + min(len(inputs), 5)
+    
+    name = node.name
+    decorators = {_call_name(decorator) or '' for decorator in node.decorator_list}
+    if name.startswith('__') and name.endswith('__'):
+        score *= DUNDER_PENALTY
+    if any(decorator.rsplit('.', 1)[-1] in PROPERTY_DECORATORS for decorator in decorators):
+        score *= PROPERTY_PENALTY
+    if test_module or name.startswith('test') or name in ('setUp', 'tearDown'):
+        score *= TEST_HELPER_PENALTY
+    if not inputs:
+        score *= NO_INPUT_PENALTY
+    return {'score': round(score, 2), 'complexity': complexity, 'loops': loops, 'parsing_calls': parsing}
+
+
+def is_test_module(file_path):
+    """Модуль тестов: test_*.py, *_test.py, conftest.py или каталог tests/"""
+    path = Path(file_path)
+    return (path.name.startswith('test_') or path.stem.endswith('_test')
+            or path.name == 'conftest.py' or path.parent.name in ('test', 'tests'))
+
+
+def _describe_param(arg, kind, default=None):
+    """Описание параметра функции: имя, вид, аннотация и значение по умолчанию"""
+    return {
+        'name': arg.arg,
+        'kind': kind,
+        'annotation': ast.unparse(arg.annotation) if arg.annotation is not None else None,
+        'default': ast.unparse(default) if default is not None else None
+    }
+
+
+class FunctionCollector(ast.NodeVisitor):
+    """Сбор функций модуля с учетом вложенности в классы и функции"""
+    
+    def __init__(self, test_module=False):
+        self.functions = []
+        self.scope = []
+        self.test_module = test_module
+    
+    def _qualname(self, name):
+        parts = []
+        for scope_name, kind in self.scope:
+            parts.append(scope_name)
+            if kind == 'function':
+                parts.append('<locals>')
+        parts.append(name)
+        return '.'.join(parts)
+    
+    def visit_ClassDef(self, node):
+        self.scope.append((node.name, 'class'))
+        self.generic_visit(node)
+        self.scope.pop()
+    
+    def visit_FunctionDef(self, node):
+        args = node.args
+        positional = args.posonlyargs + args.args
+        defaults = [None] * (len(positional) - len(args.defaults)) + list(args.defaults)
         
-        tree = ast.parse(content)
-        functions = []
+        params = [_describe_param(arg, 'positional', default)
+                  for arg, default in zip(positional, defaults)]
+        if args.vararg:
+            params.append(_describe_param(args.vararg, 'var_positional'))
+        params.extend(_describe_param(arg, 'keyword_only', default)
+                      for arg, default in zip(args.kwonlyargs, args.kw_defaults))
+        if args.kwarg:
+            params.append(_describe_param(args.kwarg, 'var_keyword'))
         
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                functions.append({
-                    'name': node.name,
-                    'line': node.lineno,
-                    'args': [arg.arg for arg in node.args.args]
-                })
+        qualname = self._qualname(node.name)
+        in_class = bool(self.scope) and self.scope[-1][1] == 'class'
+        test_helper = self.test_module or any(scope_name.startswith('Test') for scope_name, kind in self.scope
+                                              if kind == 'class')
+        self.functions.append({
+            'name': node.name,
+            'line': node.lineno,
+            'args': [arg.arg for arg in positional],
+            'qualname': qualname,
+            'class': qualname.rsplit('.', 1)[0] if in_class else None,
+            'decorators': [ast.unparse(decorator) for decorator in node.decorator_list],
+            'params': params,
+            **score_function(node, params, in_class, test_helper)
+        })
         
-        return functions
+        self.scope.append((node.name, 'function'))
+        self.generic_visit(node)
+        self.scope.pop()
+    
+    def visit_AsyncFunctionDef(self, node):
+        # Корутины не вызываются напрямую, но их вложенные определения обходим
+        self.scope.append((node.name, 'function'))
+        self.generic_visit(node)
+        self.scope.pop()
+
+
+def escape_token(data):
+    """Запись байтов в формате словарей AFL/libFuzzer"""
+    out = []
+    for byte in data:
+        if byte in (0x22, 0x5C):
+            out.append('\\' + chr(byte))
+        elif 0x20 <= byte < 0x7F:
+            out.append(chr(byte))
+        else:
+            out.append(f'\\x{byte:02x}')
+    return ''.join(out)
+
+
+def _value_tokens(value):
+    """Токены словаря из значения литерала"""
+    if isinstance(value, bool) or value is None:
+        return []
+    if isinstance(value, str):
+        data = value.encode('utf-8', 'surrogatepass')
+    elif isinstance(value, bytes):
+        data = value
+    elif isinstance(value, int):
+        if value in (0, 1):
+            return []
+        data = str(value).encode()
+    elif isinstance(value, float):
+        data = repr(value).encode()
+    else:
+        return []
+    
+    if not data or len(data) > MAX_TOKEN_LENGTH:
+        return []
+    return [escape_token(data)]
+
+
+def _literal_tokens(node):
+    """Токены из литерала или коллекции литералов (операнд сравнения, `in (...)`)"""
+    if isinstance(node, ast.Constant):
+        return _value_tokens(node.value)
+    if isinstance(node, (ast.Tuple, ast.List, ast.Set)):
+        return [token for element in node.elts for token in _literal_tokens(element)]
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub) and isinstance(node.operand, ast.Constant):
+        if isinstance(node.operand.value, (int, float)) and not isinstance(node.operand.value, bool):
+            return _value_tokens(-node.operand.value)
+    return []
+
+
+def _format_fragments(template):
+    """Литеральные фрагменты строки формата между полями подстановки"""
+    return [fragment for fragment in FORMAT_FIELD_RE.split(template) if fragment]
+
+
+def harvest_tokens(tree):
+    """Сбор словаря модуля из литералов AST.
+
+    Первыми идут операнды сравнений и аргументы startswith()/split() и т.п.,
+    затем фрагменты строк форматирования и остальные литералы; докстринги
+    пропускаются.
+    """
+    docstrings = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            body = node.body
+            if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant):
+                docstrings.add(id(body[0].value))
+    
+    priority = []
+    regular = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Compare):
+            for operand in [node.left, *node.comparators]:
+                priority.extend(_literal_tokens(operand))
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            if node.func.attr in MATCHING_METHODS:
+                for arg in node.args:
+                    priority.extend(_literal_tokens(arg))
+            elif (node.func.attr == 'format' and isinstance(node.func.value, ast.Constant)
+                  and isinstance(node.func.value.value, str)):
+                for fragment in _format_fragments(node.func.value.value):
+                    regular.extend(_value_tokens(fragment))
+        elif (isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mod)
+              and isinstance(node.left, ast.Constant) and isinstance(node.left.value, str)):
+            for fragment in _format_fragments(node.left.value):
+                regular.extend(_value_tokens(fragment))
+        elif isinstance(node, ast.Constant) and id(node) not in docstrings:
+            regular.extend(_value_tokens(node.value))
+    
+    return list(dict.fromkeys(priority + regular))[:MAX_MODULE_TOKENS]
+
+
+def analyze_module(content, file_path="<unknown>"):
+    """Полный анализ модуля: функции и токены словаря"""
+    try:
+        tree = ast.parse(content, filename=str(file_path))
+        collector = FunctionCollector(test_module=is_test_module(file_path))
+        collector.visit(tree)
+        return {'functions': collector.functions, 'tokens': harvest_tokens(tree)}
     except Exception as e:
         print(f"Error analyzing {file_path}: {e}")
+        return {'functions': [], 'tokens': []}
+
+
+def analyze_python_source(content, file_path="<unknown>"):
+    """Анализ исходного текста Python модуля"""
+    return analyze_module(content, file_path)['functions']
+
+
+def _analyze_file_job(job):
+    """Задача пула: хеширование и анализ одного файла.
+
+    Если содержимое совпало с хешем из кэша, повторный разбор не нужен
+    и вместо результата анализа возвращается None.
+    """
+    file_path, known_hash = job
+    try:
+        with open(file_path, 'rb') as f:
+            content = f.read()
+    except OSError as e:
+        print(f"Error analyzing {file_path}: {e}")
+        return None, None
+    
+    digest = hashlib.sha256(content).hexdigest()
+    if digest == known_hash:
+        return digest, None
+    return digest, analyze_module(content, file_path)
+
+
+def _cache_stamp(cache_file):
+    st = os.stat(cache_file)
+    return st.st_mtime_ns, st.st_size
+
+
+def _remember_analysis_cache(cache_file, stamp, entries):
+    ANALYSIS_CACHE_MEMO[str(cache_file)] = (stamp, entries)
+    ANALYSIS_CACHE_MEMO.move_to_end(str(cache_file))
+    while len(ANALYSIS_CACHE_MEMO) > ANALYSIS_CACHE_MEMO_SIZE:
+        ANALYSIS_CACHE_MEMO.popitem(last=False)
+
+
+def load_analysis_cache(cache_file):
+    """Загрузка кэша анализа с диска.
+
+    В долгоживущем процессе (демон генерации) разобранный кэш остается в
+    памяти и перечитывается, только если файл изменился.
+    """
+    try:
+        stamp = _cache_stamp(cache_file)
+    except OSError:
+        return {}
+    memo = ANALYSIS_CACHE_MEMO.get(str(cache_file))
+    if memo and memo[0] == stamp:
+        ANALYSIS_CACHE_MEMO.move_to_end(str(cache_file))
+        return memo[1]
+    
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    
+    if cache.get('version') != ANALYZER_VERSION:
+        return {}
+    entries = cache.get('files', {})
+    _remember_analysis_cache(cache_file, stamp, entries)
+    return entries
+
+
+def save_analysis_cache(cache_file, entries):
+    """Атомарное сохранение кэша анализа"""
+    tmp_file = Path(str(cache_file) + ".tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({'version': ANALYZER_VERSION, 'files': entries}, f)
+    os.replace(tmp_file, cache_file)
+    _remember_analysis_cache(cache_file, _cache_stamp(cache_file), entries)
+
+
+def analyze_project(project_path, python_files, cache_file=None, jobs=None):
+    """Анализ всех файлов проекта в пуле процессов с инкрементальным кэшем.
+
+    Файл считается неизменным, если совпали mtime и размер; иначе он
+    перечитывается, и разбор выполняется только при изменении sha256.
+    """
+    cache = load_analysis_cache(cache_file) if cache_file else {}
+    entries = {}
+    pending = []
+    hits = 0
+    
+    for py_file in python_files:
+        rel_path = str(py_file.relative_to(project_path))
+        try:
+            st = py_file.stat()
+        except OSError as e:
+            print(f"Error analyzing {py_file}: {e}")
+            continue
+        
+        cached = cache.get(rel_path)
+        if cached and cached['mtime'] == st.st_mtime_ns and cached['size'] == st.st_size:
+            entries[rel_path] = cached
+            hits += 1
+            continue
+        
+        known_hash = cached['sha256'] if cached else None
+        pending.append((rel_path, st, str(py_file), known_hash))
+    
+    job_args = [(file_path, known_hash) for _, _, file_path, known_hash in pending]
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    
+    if jobs > 1 and len(pending) >= PARALLEL_THRESHOLD:
+        chunksize = max(1, len(pending) // (jobs * 8))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            outcomes = list(executor.map(_analyze_file_job, job_args, chunksize=chunksize))
+    else:
+        outcomes = [_analyze_file_job(job) for job in job_args]
+    
+    for (rel_path, st, _, _), (digest, analysis) in zip(pending, outcomes):
+        if digest is None:
+            continue
+        if analysis is None:
+            # Изменились только метаданные, содержимое прежнее
+            analysis = cache[rel_path]
+            hits += 1
+        entries[rel_path] = {
+            'mtime': st.st_mtime_ns,
+            'size': st.st_size,
+            'sha256': digest,
+            'functions': analysis['functions'],
+            'tokens': analysis['tokens']
+        }
+    
+    if cache_file:
+        save_analysis_cache(cache_file, entries)
+    
+    all_functions = {
+        rel_path: entry['functions']
+        for rel_path, entry in sorted(entries.items())
+        if entry['functions']
+    }
+    module_tokens = {
+        rel_path: entry['tokens']
+        for rel_path, entry in sorted(entries.items())
+        if entry['tokens']
+    }
+    stats = {
+        'files_analyzed': len(python_files),
+        'cache_hits': hits,
+        'cache_hit_rate': hits / len(python_files) if python_files else 0.0
+    }
+    return all_functions, module_tokens, stats
+
+
+def write_dictionary(dictionary_file, module_tokens):
+    """Запись словаря AFL/libFuzzer: токены модулей по очереди, без повторов.
+
+    Модули перебираются по кругу, чтобы при ограничении размера словаря
+    каждый модуль был представлен своими самыми приоритетными токенами.
+    """
+    tokens = {}
+    queues = [(rel_path, iter(module)) for rel_path, module in module_tokens.items()]
+    while queues and len(tokens) < MAX_DICTIONARY_TOKENS:
+        active = []
+        for rel_path, queue in queues:
+            token = next(queue, None)
+            if token is None:
+                continue
+            tokens.setdefault(token, rel_path)
+            active.append((rel_path, queue))
+            if len(tokens) >= MAX_DICTIONARY_TOKENS:
+                break
+        queues = active
+    
+    by_module = {}
+    for token, rel_path in tokens.items():
+        by_module.setdefault(rel_path, []).append(token)
+    
+    with open(dictionary_file, 'w', encoding='utf-8') as f:
+        f.write("# Auto-generated by PyFuzzWrap from project literals\n")
+        index = 0
+        for rel_path, module in by_module.items():
+            f.write(f"\n# {rel_path}\n")
+            for token in module:
+                f.write(f'kw{index}="{token}"\n')
+                index += 1
+    return len(tokens)
+
+
+def select_top_targets(all_functions, top):
+    """Только N целей с наибольшей оценкой (вложенные функции не участвуют)"""
+    ranked = sorted(
+        ((func_info.get('score', 0.0), rel_path, index)
+         for rel_path, functions in all_functions.items()
+         for index, func_info in enumerate(functions)
+         if '<locals>' not in func_info.get('qualname', '')),
+        key=lambda item: (-item[0], item[1], item[2])
+    )
+    keep = {(rel_path, index) for _, rel_path, index in ranked[:top]}
+    selected = {}
+    for rel_path, functions in all_functions.items():
+        kept = [func_info for index, func_info in enumerate(functions) if (rel_path, index) in keep]
+        if kept:
+            selected[rel_path] = kept
+    return selected
+
+
+def top_targets(all_functions, limit=5):
+    """Лучшие цели по оценке для отчета: (имя, оценка)"""
+    table = wrapper_function_table(all_functions)
+    ranked = sorted(
+        ((f"{module_name_for(rel_path)}.{func_info['qualname']}", func_info.get('score') or 0.0)
+         for rel_path, functions in table.items() for func_info in functions),
+        key=lambda item: -item[1]
+    )
+    return ranked[:limit]
+
+
+def module_weight(project_path, rel_path, functions):
+    """Вес модуля для шардирования: число целей плюс оценка стоимости импорта"""
+    try:
+        size = (project_path / rel_path).stat().st_size
+    except OSError:
+        size = 0
+    return len(functions) + size / SHARD_IMPORT_BYTES
+
+
+def partition_modules(weights, shards):
+    """Жадное разбиение (LPT): самый тяжелый модуль - в наименее загруженный шард.
+
+    Модуль не делится между шардами, поэтому каждый узел импортирует
+    только модули своего шарда.
+    """
+    heap = [(0.0, index) for index in range(shards)]
+    assignment = [[] for _ in range(shards)]
+    loads = [0.0] * shards
+    for rel_path, weight in sorted(weights.items(), key=lambda item: (-item[1], item[0])):
+        load, index = heapq.heappop(heap)
+        assignment[index].append(rel_path)
+        loads[index] = load + weight
+        heapq.heappush(heap, (loads[index], index))
+    return [(modules, load) for modules, load in zip(assignment, loads) if modules]
+
+
+def write_harness(output_dir, project_path, all_functions, module_tokens, target_functions=None):
+    """Запись обертки, драйвера и словаря в каталог"""
+    output_dir.mkdir(exist_ok=True)
+    wrapper_file = output_dir / "python_fuzz_wrapper.py"
+    with open(wrapper_file, 'w', encoding='utf-8') as f:
+        f.write(generate_wrapper_code(project_path, all_functions, target_functions))
+    
+    # Словарь токенов рядом с оберткой
+    dictionary_file = output_dir / DICTIONARY_FILE_NAME
+    dictionary_tokens = write_dictionary(dictionary_file, module_tokens)
+    
+    # libFuzzer-совместимый драйвер поверх TestOneInput обертки
+    driver_file = output_dir / DRIVER_FILE_NAME
+    with open(driver_file, 'w', encoding='utf-8') as f:
+        f.write(generate_driver_code(project_path))
+    
+    return {
+        "wrapper_file": str(wrapper_file),
+        "driver_file": str(driver_file),
+        "dictionary_file": str(dictionary_file),
+        "dictionary_tokens": dictionary_tokens
+    }
+
+
+def previous_shards(output_dir):
+    """Каталоги шардов из shards.json прошлого запуска (пустой список, если его нет)"""
+    try:
+        with open(output_dir / MANIFEST_FILE_NAME, 'r', encoding='utf-8') as f:
+            shards = json.load(f).get('shards', [])
+    except (OSError, ValueError, AttributeError):
         return []
+    return [entry['directory'] for entry in shards
+            if isinstance(entry, dict) and isinstance(entry.get('directory'), str)
+            and SHARD_DIR_RE.fullmatch(entry['directory'])]
+
+
+def write_shards(output_dir, project_path, all_functions, module_tokens, shards, target_functions=None):
+    """Генерация отдельной обертки на каждый шард и манифеста shards.json"""
+    table = wrapper_function_table(all_functions)
+    weights = {rel_path: module_weight(project_path, rel_path, functions)
+               for rel_path, functions in table.items()}
+    
+    entries = []
+    for index, (modules, load) in enumerate(partition_modules(weights, shards)):
+        shard_dir = output_dir / f"shard-{index:03d}"
+        harness = write_harness(
+            shard_dir, project_path,
+            {rel_path: all_functions[rel_path] for rel_path in modules},
+            {rel_path: module_tokens[rel_path] for rel_path in modules if rel_path in module_tokens},
+            target_functions
+        )
+        entries.append({
+            "index": index,
+            "directory": shard_dir.name,
+            "wrapper": str(Path(harness["wrapper_file"]).relative_to(output_dir)),
+            "driver": str(Path(harness["driver_file"]).relative_to(output_dir)),
+            "dictionary": str(Path(harness["dictionary_file"]).relative_to(output_dir)),
+            "modules": sorted(modules),
+            "functions": sum(len(table[rel_path]) for rel_path in modules),
+            "weight": round(load, 2)
+        })
+    
+    # Шарды прошлого запуска с большим --shards не должны остаться рядом с новым манифестом.
+    # Удаляются только каталоги из прежнего манифеста с именем shard-NNN, чужие данные в --output не трогаются
+    current = {entry["directory"] for entry in entries}
+    for name in previous_shards(output_dir):
+        stale_dir = output_dir / name
+        if name not in current and stale_dir.is_dir() and not stale_dir.is_symlink():
+            shutil.rmtree(stale_dir)
+    
+    manifest_file = output_dir / MANIFEST_FILE_NAME
+    manifest = {"project": str(project_path), "analyzer_version": ANALYZER_VERSION, "shards": entries}
+    tmp_file = manifest_file.with_suffix('.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_file, manifest_file)
+    return manifest_file, entries
 
 
-def generate_fuzzing_wrapper(project_path, target_functions=None, output_dir=None):
+def generate_fuzzing_wrapper(project_path, target_functions=None, output_dir=None,
+                             jobs=None, use_cache=True, shards=1, top=None):
     """Генерация fuzzing wrapper для Python проекта"""
     project_path = Path(project_path)
     
     if not project_path.exists():
         raise ValueError(f"Project path does not exist: {project_path}")
     
-    # Поиск Python файлов
-    python_files = list(project_path.rglob("*.py"))
-    
-    if not python_files:
-        raise ValueError("No Python files found in project")
-    
-    # Анализ функций
-    all_functions = {}
-    for py_file in python_files[:5]:  # Ограничиваем анализ первыми 5 файлами
-        rel_path = py_file.relative_to(project_path)
-        functions = analyze_python_code(py_file)
-        if functions:
-            all_functions[str(rel_path)] = functions
-    
-    # Генерация wrapper кода
-    wrapper_code = generate_wrapper_code(project_path, all_functions, target_functions)
-    
-    # Сохранение wrapper
     if not output_dir:
         output_dir = project_path / "fuzzing_wrappers"
     else:
@@ -67,18 +652,277 @@ def generate_fuzzing_wrapper(project_path, target_functions=None, output_dir=Non
     
     output_dir.mkdir(exist_ok=True)
     
-    wrapper_file = output_dir / "python_fuzz_wrapper.py"
-    with open(wrapper_file, 'w', encoding='utf-8') as f:
-        f.write(wrapper_code)
+    # Поиск Python файлов (сгенерированные обертки не анализируем)
+    output_root = output_dir.resolve()
+    python_files = [
+        py_file for py_file in project_path.rglob("*.py")
+        if output_root not in py_file.resolve().parents
+    ]
+    
+    if not python_files:
+        raise ValueError("No Python files found in project")
+    
+    # Анализ функций
+    cache_file = output_dir / CACHE_FILE_NAME if use_cache else None
+    all_functions, module_tokens, stats = analyze_project(project_path, python_files, cache_file, jobs)
+    functions_found = sum(len(funcs) for funcs in all_functions.values())
+    if top is not None:
+        all_functions = select_top_targets(all_functions, top)
+        module_tokens = {rel_path: tokens for rel_path, tokens in module_tokens.items() if rel_path in all_functions}
     
+    if shards > 1:
+        manifest_file, entries = write_shards(output_dir, project_path.resolve(), all_functions,
+                                              module_tokens, shards, target_functions)
+        return {
+            "manifest_file": str(manifest_file),
+            "shards": entries,
+            "functions_found": functions_found,
+            "top_targets": top_targets(all_functions),
+            **stats
+        }
+    
+    harness = write_harness(output_dir, project_path.resolve(), all_functions, module_tokens, target_functions)
     return {
-        "wrapper_file": str(wrapper_file),
-        "functions_found": sum(len(funcs) for funcs in all_functions.values())
+        **harness,
+        "functions_found": functions_found,
+        "top_targets": top_targets(all_functions),
+        **stats
     }
 
 
+# Генераторы значений для простых аннотаций типов
+TYPE_GENERATORS = {
+    'int': 'gen_int()',
+    'float': 'gen_float()',
+    'complex': 'complex(gen_float(), gen_float())',
+    'str': 'gen_str()',
+    'bytes': 'gen_bytes()',
+    'bytearray': 'bytearray(gen_bytes())',
+    'bool': 'gen_bool()',
+    'list': 'gen_list()',
+    'List': 'gen_list()',
+    'Sequence': 'gen_list()',
+    'Iterable': 'gen_list()',
+    'tuple': 'tuple(gen_list())',
+    'Tuple': 'tuple(gen_list())',
+    'set': 'set(gen_list())',
+    'Set': 'set(gen_list())',
+    'dict': 'gen_dict()',
+    'Dict': 'gen_dict()',
+    'Mapping': 'gen_dict()',
+    'None': 'None',
+    'NoneType': 'None',
+    'Any': 'gen_any()',
+    'object': 'gen_any()'
+}
+SEQUENCE_TYPES = {'list', 'List', 'Sequence', 'Iterable', 'set', 'Set', 'frozenset', 'FrozenSet'}
+MAPPING_TYPES = {'dict', 'Dict', 'Mapping', 'MutableMapping'}
+# Поля описания функции, которые попадают в FUNCTIONS_TO_FUZZ обертки
+WRAPPER_FUNCTION_FIELDS = ('name', 'line', 'qualname', 'class', 'args', 'decorators', 'score')
+
+
+def module_name_for(file_path):
+    """Имя импортируемого модуля по относительному пути файла"""
+    parts = list(Path(file_path).with_suffix('').parts)
+    if parts and parts[-1] == '__init__':
+        parts.pop()
+    return '.'.join(parts)
+
+
+def _annotation_name(node):
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def _union_generator(nodes):
+    """Выражение равновероятного выбора между вариантами Union"""
+    options = []
+    for node in nodes:
+        option = annotation_generator(node) or 'gen_any()'
+        if option not in options:
+            options.append(option)
+    
+    if len(options) == 1:
+        return options[0]
+    if len(options) == 2 and 'None' in options:
+        other = options[0] if options[1] == 'None' else options[1]
+        return f"(None if _random() < 0.1 else {other})"
+    
+    expr = options[-1]
+    for index in range(len(options) - 2, -1, -1):
+        expr = f"({options[index]} if _random() < {1 / (len(options) - index):.3f} else {expr})"
+    return expr
+
+
+def annotation_generator(node):
+    """Выражение-генератор значения по узлу аннотации (None, если тип неизвестен)"""
+    if isinstance(node, ast.Constant):
+        if node.value is None:
+            return 'None'
+        if isinstance(node.value, str):
+            # Строковая (отложенная) аннотация
+            try:
+                return annotation_generator(ast.parse(node.value, mode='eval').body)
+            except SyntaxError:
+                return None
+        return None
+    
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        return _union_generator([node.left, node.right])
+    
+    if isinstance(node, ast.Subscript):
+        base = _annotation_name(node.value)
+        items = node.slice.elts if isinstance(node.slice, ast.Tuple) else [node.slice]
+        if base == 'Optional':
+            return _union_generator([items[0], ast.Constant(None)])
+        if base == 'Union':
+            return _union_generator(items)
+        if base == 'Literal':
+            return f"_choice(({''.join(ast.unparse(item) + ', ' for item in items)}))"
+        if base == 'Annotated':
+            return annotation_generator(items[0])
+        if base in SEQUENCE_TYPES:
+            element = annotation_generator(items[0]) or 'gen_any()'
+            expr = f"[{element} for _ in range(_randrange(4))]"
+            return f"set({expr})" if base.lower().endswith('set') else expr
+        if base in ('tuple', 'Tuple'):
+            if len(items) == 2 and isinstance(items[1], ast.Constant) and items[1].value is Ellipsis:
+                element = annotation_generator(items[0]) or 'gen_any()'
+                return f"tuple({element} for _ in range(_randrange(4)))"
+            return f"({''.join((annotation_generator(item) or 'gen_any()') + ', ' for item in items)})"
+        if base in MAPPING_TYPES and len(items) == 2:
+            key = annotation_generator(items[0]) or 'gen_str(8)'
+            value = annotation_generator(items[1]) or 'gen_any()'
+            return f"{{{key}: {value} for _ in range(_randrange(3))}}"
+        return TYPE_GENERATORS.get(base)
+    
+    return TYPE_GENERATORS.get(_annotation_name(node))
+
+
+def default_generator(default_source):
+    """Выражение-генератор по типу значения по умолчанию"""
+    try:
+        value = ast.literal_eval(default_source)
+    except (ValueError, SyntaxError):
+        return None
+    
+    if isinstance(value, bool):
+        return 'gen_bool()'
+    for value_type, generator in ((int, 'gen_int()'), (float, 'gen_float()'),
+                                  (str, 'gen_str()'), (bytes, 'gen_bytes()'),
+                                  (list, 'gen_list()'), (tuple, 'tuple(gen_list())'),
+                                  (dict, 'gen_dict()')):
+        if isinstance(value, value_type):
+            return generator
+    return None
+
+
+def param_generator(param):
+    """Выражение-генератор для параметра: по аннотации, затем по умолчанию"""
+    generator = None
+    if param.get('annotation'):
+        try:
+            generator = annotation_generator(ast.parse(param['annotation'], mode='eval').body)
+        except SyntaxError:
+            generator = None
+    if generator is None and param.get('default'):
+        generator = default_generator(param['default'])
+    return generator or 'gen_any()'
+
+
+def _param_signature(param):
+    text = param['name']
+    if param['kind'] == 'var_positional':
+        text = '*' + text
+    elif param['kind'] == 'var_keyword':
+        text = '**' + text
+    if param.get('annotation'):
+        text += f": {param['annotation']}"
+    if param.get('default'):
+        text += f" = {param['default']}" if param.get('annotation') else f"={param['default']}"
+    return text
+
+
+def build_arg_factory(factory_name, target_name, func_info):
+    """Исходный код специализированной фабрики аргументов одной цели.
+
+    Выражения-генераторы выбираются здесь, при генерации обертки, поэтому
+    во время фаззинга фабрика не выполняет диспетчеризацию по типам.
+    """
+    params = list(func_info.get('params', []))
+    if (func_info.get('class') and 'staticmethod' not in func_info.get('decorators', [])
+            and params and params[0]['kind'] == 'positional'):
+        params = params[1:]  # self / cls
+    
+    positional = []
+    keywords = []
+    var_positional = var_keyword = False
+    for param in params:
+        kind = param['kind']
+        if kind == 'positional':
+            positional.append(param_generator(param))
+        elif kind == 'keyword_only':
+            keywords.append(f"{param['name']!r}: {param_generator(param)}")
+        elif kind == 'var_positional':
+            var_positional = True
+        else:
+            var_keyword = True
+    
+    args_expr = '(' + ''.join(generator + ', ' for generator in positional).rstrip(' ') + ')'
+    if var_positional:
+        args_expr += ' + tuple(gen_any() for _ in range(_randrange(3)))'
+    if var_keyword:
+        keywords.append('**gen_kwargs()')
+    kwargs_expr = '{' + ', '.join(keywords) + '}'
+    
+    signature = ', '.join(_param_signature(param) for param in params)
+    comment = f"{target_name}({signature})".replace('\n', ' ')[:200]
+    return (
+        f"def {factory_name}():\n"
+        f"    # {comment}\n"
+        f"    return {args_expr}, {kwargs_expr}\n"
+    )
+
+
+def generate_arg_factories(all_functions):
+    """Фабрики аргументов для всех целей и таблица ARG_FACTORIES"""
+    blocks = []
+    table = []
+    for file_path, functions in all_functions.items():
+        module_name = module_name_for(file_path)
+        for func_info in functions:
+            qualname = func_info.get('qualname', func_info['name'])
+            if '<locals>' in qualname:
+                continue
+            target_name = f"{module_name}.{qualname}"
+            factory_name = f"_args_{len(table)}"
+            blocks.append(build_arg_factory(factory_name, target_name, func_info))
+            table.append(f"    {target_name!r}: {factory_name},")
+    
+    return '\n\n'.join(blocks) + '\n\nARG_FACTORIES = {\n' + '\n'.join(table) + '\n}\n'
+
+
+def wrapper_function_table(all_functions):
+    """Компактное описание целей для обертки (без вложенных функций)"""
+    table = {}
+    for file_path, functions in all_functions.items():
+        entries = [
+            {key: func_info.get(key) for key in WRAPPER_FUNCTION_FIELDS}
+            for func_info in functions
+            if '<locals>' not in func_info.get('qualname', '')
+        ]
+        if entries:
+            table[file_path] = entries
+    return table
+
+
 def generate_wrapper_code(project_path, all_functions, target_functions):
     """Генерация кода wrapper"""
+    function_table = wrapper_function_table(all_functions)
+    arg_factories = generate_arg_factories(all_functions)
     
     code = f'''#!/usr/bin/env python3
 """
@@ -89,112 +933,2402 @@ Generated by: PyFuzzWrap
 
 import sys
 import os
+import re
+import math
+import mmap
+import pickle
+import builtins
 import random
 import string
 import json
+import time
+import struct
+import hashlib
+import base64
+import signal
+import inspect
+import importlib
+import select
+import selectors
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # Добавляем путь к проекту
-sys.path.insert(0, "{project_path}")
+PROJECT_ROOT = "{project_path}"
+sys.path.insert(0, PROJECT_ROOT)
 
-class FuzzTester:
-    """Класс для fuzzing тестирования Python функций"""
+
+def module_name_for(file_path):
+    """Имя импортируемого модуля по относительному пути файла"""
+    parts = list(Path(file_path).with_suffix('').parts)
+    if parts and parts[-1] == '__init__':
+        parts.pop()
+    return '.'.join(parts)
+
+
+# Размер битовой карты покрытия (как в AFL)
+MAP_SIZE = 1 << 16
+MAP_MASK = MAP_SIZE - 1
+HARNESS_FILE = os.path.abspath(__file__)
+# Вероятность взять вход из корпуса вместо генерации нового
+CORPUS_PICK_PROBABILITY = 0.8
+# Вероятность скрещивания с другим входом корпуса перед мутацией
+SPLICE_PROBABILITY = 0.15
+# Словарь токенов, собранный генератором из литералов проекта
+DICTIONARY_FILE = os.path.join(os.path.dirname(HARNESS_FILE), "python_fuzz_wrapper.dict")
+# Вероятность взять токен словаря при генерации значения
+DICTIONARY_PROBABILITY = 0.2
+# Каталог репродьюсеров ошибок (подкаталог на функцию, файл на корзину)
+CRASH_DIR = os.path.join(os.path.dirname(HARNESS_FILE), "crashes")
+# Встроенные типы, допустимые в файлах корпуса (помимо литералов pickle)
+CORPUS_BUILTINS = frozenset({{"bytearray", "complex", "set", "frozenset"}})
+# Размер буфера мутаций и максимальная глубина стека havoc (2 ** N операций)
+MAX_INPUT_SIZE = 4096
+HAVOC_STACK_POWER = 4
+# Интервал сообщений рабочего процесса родителю и лимит его перезапусков
+WORKER_HEARTBEAT_INTERVAL = 1.0
+MAX_WORKER_RESTARTS = 10
+# Общая память рабочего процесса под текущий вход: длина сериализованного входа и предел
+WORKER_INFLIGHT_HEADER = struct.Struct('<q')
+WORKER_INFLIGHT_BYTES = 1 << 22
+# Интервал записей потока статистики JSONL по умолчанию (секунды)
+STATS_INTERVAL = 5.0
+# Число самых глубоких кадров трассировки в сигнатуре корзины ошибок
+BUCKET_FRAMES = 5
+# Ошибки, означающие, что вызов отвергнут на проверке аргументов
+ARG_REJECT_ERRORS = (TypeError,)
+# Число попыток создать экземпляр класса для фаззинга его методов
+INSTANCE_ATTEMPTS = 20
+# Бюджет времени на один вызов (секунды) и число зависаний до карантина цели
+CALL_TIMEOUT = 1.0
+HANG_QUARANTINE_LIMIT = 3
+# Предельное время пакета вызовов в дочернем процессе fork-сервера
+FORK_CHILD_TIMEOUT = 60.0
+# Планировщик bandit: затухание статистики за итерацию и предел поправки на скорость
+SCHEDULE_DECAY = 0.999
+SCHEDULE_SPEED_LIMIT = 2.0
+# Априорное число "находок" у цели с наибольшей статической оценкой
+SCHEDULE_SCORE_PRIOR = 2.0
+SCHEDULES = ("round-robin", "bandit")
+
+
+class CoverageMap:
+    """Сбор покрытия переходов между строками кода проекта в битовую карту.
+
+    На Python 3.12+ используется sys.monitoring (PEP 669), на более старых
+    версиях - sys.settrace. Учитывается только код из PROJECT_ROOT, кроме
+    самой обертки; ребро (prev -> cur) кодируется как в AFL.
+    """
     
-    def __init__(self):
-        self.results = []
-        self.errors = []
+    def __init__(self, root=PROJECT_ROOT):
+        self.root = os.path.join(os.path.abspath(root), '')
+        self.bitmap = bytearray(MAP_SIZE)
+        self.edges = 0
+        self.prev = 0
+        self._bases = {{}}
+        self._tool_id = None
+        self.backend = 'monitoring' if hasattr(sys, 'monitoring') else 'settrace'
     
-    def fuzz_string(self, length=100):
-        """Генерация случайной строки"""
-        return ''.join(random.choices(string.ascii_letters + string.digits + string.punctuation, k=length))
+    def _code_base(self, code):
+        """Базовый индекс объекта кода в карте, -1 для кода вне проекта"""
+        filename = os.path.abspath(code.co_filename)
+        if filename.startswith(self.root) and filename != HARNESS_FILE:
+            base = hash((filename, code.co_firstlineno, code.co_name)) & MAP_MASK
+        else:
+            base = -1
+        self._bases[code] = base
+        return base
     
-    def fuzz_number(self, min_val=-1000, max_val=1000):
-        """Генерация случайного числа"""
-        return random.randint(min_val, max_val)
+    def _record_line(self, base, line):
+        cur = (base + line * 40503) & MAP_MASK
+        idx = cur ^ self.prev
+        self.prev = cur >> 1
+        if not self.bitmap[idx]:
+            self.bitmap[idx] = 1
+            self.edges += 1
     
-    def test_function(self, module_name, func_name, args_count):
-        """Тестирование функции с случайными данными"""
-        try:
-            module = __import__(module_name.replace('.py', '').replace('/', '.'))
-            func = getattr(module, func_name)
-            
-            # Генерация аргументов
-            args = []
-            for i in range(args_count):
-                arg_type = random.choice(['string', 'number', 'none'])
-                if arg_type == 'string':
-                    args.append(self.fuzz_string())
-                elif arg_type == 'number':
-                    args.append(self.fuzz_number())
-                else:
-                    args.append(None)
-            
-            # Вызов функции
-            result = func(*args)
-            self.results.append({{
-                "function": f"{{module_name}}.{{func_name}}",
-                "status": "success"
-            }})
-            
-        except Exception as e:
-            self.errors.append({{
-                "function": f"{{module_name}}.{{func_name}}",
-                "error": str(e),
-                "error_type": type(e).__name__
-            }})
+    # --- sys.monitoring (PEP 669) ---
+    
+    def _on_line(self, code, line):
+        base = self._bases.get(code)
+        if base is None:
+            base = self._code_base(code)
+        if base < 0:
+            return sys.monitoring.DISABLE
+        self._record_line(base, line)
+    
+    def _on_branch(self, code, offset, destination):
+        base = self._bases.get(code)
+        if base is None:
+            base = self._code_base(code)
+        if base < 0:
+            return sys.monitoring.DISABLE
+        idx = (base + offset * 7919 + destination * 104729) & MAP_MASK
+        if not self.bitmap[idx]:
+            self.bitmap[idx] = 1
+            self.edges += 1
+    
+    def _start_monitoring(self):
+        monitoring = sys.monitoring
+        events = monitoring.events
+        tool_id = monitoring.COVERAGE_ID
+        monitoring.use_tool_id(tool_id, "pyfuzzwrap")
+        
+        event_set = events.LINE
+        monitoring.register_callback(tool_id, events.LINE, self._on_line)
+        branch_events = [getattr(events, name) for name in ('BRANCH_LEFT', 'BRANCH_RIGHT')
+                         if hasattr(events, name)]
+        if not branch_events:
+            branch_events = [events.BRANCH]
+        for event in branch_events:
+            monitoring.register_callback(tool_id, event, self._on_branch)
+            event_set |= event
+        
+        monitoring.set_events(tool_id, event_set)
+        self._tool_id = tool_id
+    
+    # --- sys.settrace ---
+    
+    def _global_trace(self, frame, event, arg):
+        base = self._bases.get(frame.f_code)
+        if base is None:
+            base = self._code_base(frame.f_code)
+        if base < 0:
+            return None
+        return self._local_trace
+    
+    def _local_trace(self, frame, event, arg):
+        if event == 'line':
+            self._record_line(self._bases[frame.f_code], frame.f_lineno)
+        return self._local_trace
+    
+    def start(self):
+        """Включение сбора покрытия"""
+        if self.backend == 'monitoring':
+            try:
+                self._start_monitoring()
+                return
+            except ValueError:
+                # Идентификатор инструмента занят (например, coverage.py)
+                self.backend = 'settrace'
+        sys.settrace(self._global_trace)
+    
+    def restore(self):
+        """Повторная установка трассировщика после прерванного вызова.
 
-# Обнаруженные функции для фаззинга
-FUNCTIONS_TO_FUZZ = {json.dumps(all_functions, indent=2)}
+        Если исключение (CallTimeout из обработчика SIGALRM) возникает
+        внутри функции трассировки, CPython снимает ее, и покрытие дальше
+        не собирается. Возвращает True, если сбор покрытия активен.
+        """
+        if self.backend != 'settrace':
+            return True
+        # Связанный метод создается заново при каждом обращении, поэтому ==, а не is
+        if sys.gettrace() != self._global_trace:
+            sys.settrace(self._global_trace)
+        return sys.gettrace() == self._global_trace
+    
+    def stop(self):
+        """Отключение сбора покрытия"""
+        if self._tool_id is not None:
+            sys.monitoring.set_events(self._tool_id, 0)
+            sys.monitoring.free_tool_id(self._tool_id)
+            self._tool_id = None
+        else:
+            sys.settrace(None)
 
-def run_fuzzing_session(iterations=100):
-    """Запуск сессии фаззинга"""
-    tester = FuzzTester()
+
+class CallTimeout(BaseException):
+    """Вызов превысил бюджет времени.
+
+    Наследуется от BaseException, чтобы цель не поглотила его в except Exception.
+    """
+
+
+class ChildCrash(Exception):
+    """Дочерний процесс fork-сервера погиб на входе (сигнал или код выхода)"""
+
+
+class HangWatchdog:
+    """Сторож зависаний на периодическом SIGALRM без отдельного процесса на вызов.
+
+    Таймер тикает каждые timeout / 2 секунд, а test_function увеличивает
+    счетчик call до и после вызова (нечетное значение - вызов идет).
+    Если два тика подряд видят тот же нечетный счетчик, вызов длится не
+    меньше timeout и прерывается исключением CallTimeout. Циклы внутри
+    C-кода сигнал не прерывает - их ловит таймаут рабочего процесса.
+    """
     
-    print(f"Starting Python fuzzing session with {{iterations}} iterations...")
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.call = 0
+        self.seen = -1
+        self.streak = 0
+        self.previous = None
     
-    for i in range(iterations):
-        for file_path, functions in FUNCTIONS_TO_FUZZ.items():
-            for func_info in functions:
-                tester.test_function(
-                    file_path, 
-                    func_info['name'], 
-                    len(func_info['args'])
-                )
-        
-        if i % 10 == 0:
-            print(f"Progress: {{i}}/{{iterations}} iterations completed")
+    def _on_alarm(self, signum, frame):
+        call = self.call
+        if not call & 1 or call != self.seen:
+            self.seen = call
+            self.streak = 0
+            return
+        self.streak += 1
+        if self.streak >= 2:
+            self.streak = 0
+            raise CallTimeout(f"call exceeded {{self.timeout}}s budget")
     
-    # Вывод результатов
-    print(f"\\nFuzzing completed!")
-    print(f"Successful calls: {{len(tester.results)}}")
-    print(f"Errors found: {{len(tester.errors)}}")
+    def start(self):
+        self.previous = signal.signal(signal.SIGALRM, self._on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, self.timeout / 2, self.timeout / 2)
     
-    if tester.errors:
-        print("\\nErrors detected:")
-        for error in tester.errors[:5]:
-            print(f"  - {{error['function']}}: {{error['error_type']}}")
+    def stop(self):
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, self.previous or signal.SIG_DFL)
+
+
+def error_signature(exc):
+    """Сигнатура ошибки: тип исключения и BUCKET_FRAMES самых глубоких кадров"""
+    frames = []
+    tb = exc.__traceback__
+    while tb is not None:
+        code = tb.tb_frame.f_code
+        frames.append((code.co_filename, code.co_name, tb.tb_lineno))
+        tb = tb.tb_next
+    return (type(exc).__name__,) + tuple(frames[-BUCKET_FRAMES:])
+
+
+def hang_signature(name):
+    """Сигнатура зависания: одна корзина на цель.
+
+    Строка, на которой сработал таймер, и кадры трассировщика в стеке
+    случайны, поэтому в сигнатуру не входят.
+    """
+    return ("CallTimeout", ("<hang>", name, 0))
+
+
+PRINTABLE = string.ascii_letters + string.digits + string.punctuation
+# Таблица перевода произвольных байтов в печатные символы для gen_str
+PRINTABLE_TABLE = bytes(ord(PRINTABLE[i % len(PRINTABLE)]) for i in range(256))
+INTERESTING_INTS = (
+    0, 1, -1, 2, 7, 8, 16, 32, 64, 100, 127, 128, 255, 256, 512, 1000, 1024, 4096,
+    32767, 32768, 65535, 65536, 2 ** 31 - 1, -2 ** 31, 2 ** 32, 2 ** 63 - 1, -2 ** 63
+)
+INTERESTING_FLOATS = (
+    0.0, -0.0, 1.0, -1.0, 0.5, 1e308, -1e308, 5e-324, float('inf'), float('-inf'), float('nan')
+)
+_random = random.random
+_randrange = random.randrange
+_randint = random.randint
+_choice = random.choice
+_choices = random.choices
+_uniform = random.uniform
+_randbytes = random.randbytes
+
+
+def _below(n):
+    """Быстрый аналог random.randrange(n) для горячих путей мутатора"""
+    return int(_random() * n)
+
+
+# Токены словаря по типам значений (заполняются use_dictionary)
+DICTIONARY_TOKENS = []
+DICTIONARY_STRS = []
+DICTIONARY_INTS = []
+
+
+def load_dictionary(path):
+    """Чтение словаря в формате AFL/libFuzzer (name="value", \\\\xNN-экранирование)"""
+    tokens = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+    except OSError:
+        return tokens
     
-    return len(tester.errors) == 0
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        start, end = line.find('"'), line.rfind('"')
+        if start < 0 or end <= start:
+            continue
+        body = line[start + 1:end]
+        token = bytearray()
+        i = 0
+        while i < len(body):
+            char = body[i]
+            if char == '\\\\' and i + 1 < len(body):
+                if body[i + 1] == 'x' and i + 3 < len(body):
+                    try:
+                        token.append(int(body[i + 2:i + 4], 16))
+                        i += 4
+                        continue
+                    except ValueError:
+                        pass
+                token.extend(body[i + 1].encode('utf-8'))
+                i += 2
+                continue
+            token.extend(char.encode('utf-8'))
+            i += 1
+        if token:
+            tokens.append(bytes(token))
+    return tokens
 
-if __name__ == "__main__":
-    import argparse
-    parser = argparse.ArgumentParser(description="Python Fuzzing Wrapper")
-    parser.add_argument("--iterations", type=int, default=100, help="Number of fuzzing iterations")
+
+def use_dictionary(tokens):
+    """Подключение токенов словаря к генераторам значений"""
+    DICTIONARY_TOKENS[:] = tokens
+    DICTIONARY_STRS[:] = [token.decode('utf-8', 'replace') for token in tokens]
+    DICTIONARY_INTS[:] = [int(token) for token in tokens if token.lstrip(b'-').isdigit()]
+
+
+def gen_int():
+    """Случайное целое с упором на граничные значения и константы проекта"""
+    roll = _random()
+    if roll < 0.25:
+        return _choice(INTERESTING_INTS)
+    if roll < 0.25 + DICTIONARY_PROBABILITY and DICTIONARY_INTS:
+        return _choice(DICTIONARY_INTS)
+    return _randint(-1000, 1000)
+
+
+def gen_float():
+    """Случайное число с плавающей точкой"""
+    if _random() < 0.1:
+        return _choice(INTERESTING_FLOATS)
+    return _uniform(-1e6, 1e6)
+
+
+def gen_str(max_length=100):
+    """Случайная строка или токен словаря"""
+    if DICTIONARY_STRS and _random() < DICTIONARY_PROBABILITY:
+        return _choice(DICTIONARY_STRS)
+    return _randbytes(_randrange(max_length + 1)).translate(PRINTABLE_TABLE).decode('ascii')
+
+
+def gen_bytes(max_length=100):
+    """Случайные байты или токен словаря"""
+    if DICTIONARY_TOKENS and _random() < DICTIONARY_PROBABILITY:
+        return _choice(DICTIONARY_TOKENS)
+    return _randbytes(_randrange(max_length + 1))
+
+
+def gen_bool():
+    return _random() < 0.5
+
+
+def gen_any():
+    """Значение неизвестного типа: строка, число или None"""
+    kind = _randrange(3)
+    if kind == 0:
+        return gen_str()
+    elif kind == 1:
+        return gen_int()
+    return None
+
+
+def gen_list():
+    return [gen_any() for _ in range(_randrange(4))]
+
+
+def gen_dict():
+    return {{gen_str(8): gen_any() for _ in range(_randrange(3))}}
+
+
+def gen_kwargs():
+    return {{'kw' + str(_randrange(4)): gen_any() for _ in range(_randrange(3))}}
+
+
+def generic_factory(args_count):
+    """Фабрика аргументов для целей без сгенерированной фабрики"""
+    def factory():
+        return tuple(gen_any() for _ in range(args_count)), {{}}
+    return factory
+
+
+class ByteStream:
+    """Источник случайности из байтов входа (аналог FuzzedDataProvider).
+
+    Повторяет методы random, которыми пользуются генераторы значений, поэтому
+    сгенерированные фабрики аргументов работают поверх байтов без изменений,
+    а близкие входы дают близкие аргументы. За концом данных читаются нули.
+    """
     
-    args = parser.parse_args()
+    def __init__(self, data):
+        self.data = bytes(data)
+        self.pos = 0
     
-    success = run_fuzzing_session(args.iterations)
+    def take(self, n):
+        chunk = self.data[self.pos:self.pos + n]
+        self.pos += len(chunk)
+        return chunk
+    
+    def _int(self, n):
+        return int.from_bytes(self.take(n), 'little')
+    
+    def random(self):
+        return self._int(1) / 256
+    
+    def randrange(self, start, stop=None):
+        if stop is None:
+            start, stop = 0, start
+        width = stop - start
+        if width <= 0:
+            raise ValueError(f"empty range for randrange({{start}}, {{stop}})")
+        return start + self._int((width.bit_length() + 7) // 8) % width
+    
+    def randint(self, a, b):
+        return self.randrange(a, b + 1)
+    
+    def choice(self, seq):
+        return seq[self.randrange(len(seq))]
+    
+    def choices(self, population, k=1):
+        return [self.choice(population) for _ in range(k)]
+    
+    def uniform(self, a, b):
+        return a + (b - a) * self._int(4) / 0xFFFFFFFF
+    
+    def randbytes(self, n):
+        return self.take(n)
+
+
+# Псевдонимы random, подменяемые на время декодирования входа
+STREAM_ALIASES = ('_random', '_randrange', '_randint', '_choice', '_choices', '_uniform', '_randbytes')
+
+
+def decode_input(data, factory):
+    """Вызов фабрики аргументов с байтами входа вместо генератора случайных чисел"""
+    stream = ByteStream(data)
+    namespace = globals()
+    saved = {{name: namespace[name] for name in STREAM_ALIASES}}
+    namespace.update({{name: getattr(stream, name[1:]) for name in STREAM_ALIASES}})
+    try:
+        return factory()
+    finally:
+        namespace.update(saved)
+
+
+class Mutator:
+    """Движок мутаций в стиле AFL поверх заранее выделенного bytearray.
+
+    Строки и байты загружаются в один буфер фиксированного размера и
+    мутируются на месте (перевороты битов и байтов, арифметика, подстановка
+    граничных чисел, вставка/удаление/дублирование блоков, стек havoc,
+    скрещивание); числа и контейнеры мутируются с сохранением типа.
+    """
+    
+    def __init__(self, max_size=MAX_INPUT_SIZE, dictionary=()):
+        self.buffer = bytearray(max_size)
+        self.view = memoryview(self.buffer)
+        self.max_size = max_size
+        self.size = 0
+        self.dictionary = [token for token in dictionary if len(token) <= max_size]
+        self.byte_operations = (
+            self.flip_bit, self.flip_bit, self.flip_byte, self.random_byte,
+            self.arith_byte, self.interesting_value, self.interesting_value,
+            self.delete_block, self.insert_block, self.duplicate_block, self.overwrite_block
+        )
+        if self.dictionary:
+            # Токены словаря получают примерно четверть операций havoc
+            self.byte_operations += (self.insert_token, self.overwrite_token) * 2
+    
+    def load(self, data):
+        size = min(len(data), self.max_size)
+        self.view[:size] = data[:size]
+        self.size = size
+    
+    def result(self):
+        return self.view[:self.size].tobytes()
+    
+    # --- операции над буфером ---
+    
+    def flip_bit(self):
+        pos = _below(self.size << 3)
+        self.buffer[pos >> 3] ^= 128 >> (pos & 7)
+    
+    def flip_byte(self):
+        self.buffer[_below(self.size)] ^= 0xFF
+    
+    def random_byte(self):
+        self.buffer[_below(self.size)] = _below(256)
+    
+    def arith_byte(self):
+        pos = _below(self.size)
+        self.buffer[pos] = (self.buffer[pos] + _randint(-35, 35)) & 0xFF
+    
+    def interesting_value(self):
+        """Запись граничного целого шириной 1, 2 или 4 байта"""
+        width = _choice((1, 2, 4))
+        if self.size < width:
+            return self.random_byte()
+        pos = _below(self.size - width + 1)
+        fmt = _choice(('<', '>')) + {{1: 'b', 2: 'h', 4: 'i'}}[width]
+        limit = 1 << (width * 8 - 1)
+        value = _choice(INTERESTING_INTS)
+        if not -limit <= value < limit:
+            value = _choice((-limit, limit - 1))
+        struct.pack_into(fmt, self.buffer, pos, value)
+    
+    def _block_length(self, available):
+        return 1 + _below(min(available, 32))
+    
+    def delete_block(self):
+        if self.size < 2:
+            return self.random_byte()
+        length = self._block_length(self.size - 1)
+        pos = _below(self.size - length + 1)
+        self.view[pos:self.size - length] = self.buffer[pos + length:self.size]
+        self.size -= length
+    
+    def _make_room(self, pos, length):
+        """Сдвиг хвоста буфера вправо для вставки блока длины length"""
+        length = min(length, self.max_size - self.size)
+        if length > 0:
+            self.view[pos + length:self.size + length] = self.buffer[pos:self.size]
+            self.size += length
+        return length
+    
+    def insert_block(self):
+        pos = _below(self.size + 1)
+        length = self._make_room(pos, self._block_length(16))
+        if length > 0:
+            self.view[pos:pos + length] = random.randbytes(length)
+    
+    def duplicate_block(self):
+        length = self._block_length(self.size)
+        src = _below(self.size - length + 1)
+        block = self.buffer[src:src + length]
+        pos = _below(self.size + 1)
+        length = self._make_room(pos, length)
+        self.view[pos:pos + length] = block[:length]
+    
+    def overwrite_block(self):
+        if self.size < 2:
+            return self.random_byte()
+        length = self._block_length(self.size - 1)
+        src = _below(self.size - length + 1)
+        dst = _below(self.size - length + 1)
+        self.view[dst:dst + length] = self.buffer[src:src + length]
+    
+    def insert_token(self):
+        token = _choice(self.dictionary)
+        pos = _below(self.size + 1)
+        length = self._make_room(pos, len(token))
+        self.view[pos:pos + length] = token[:length]
+    
+    def overwrite_token(self):
+        token = _choice(self.dictionary)
+        if len(token) > self.size:
+            return self.insert_token()
+        pos = _below(self.size - len(token) + 1)
+        self.view[pos:pos + len(token)] = token
+    
+    def havoc(self):
+        """Стек из 2..2**HAVOC_STACK_POWER случайных операций"""
+        operations = self.byte_operations
+        for _ in range(1 << (1 + _below(HAVOC_STACK_POWER))):
+            if self.size == 0:
+                self.insert_block()
+            else:
+                _choice(operations)()
+    
+    def splice(self, other):
+        """Скрещивание: префикс текущего буфера и суффикс другого входа"""
+        if self.size < 2 or len(other) < 2:
+            return
+        split = 1 + _below(min(self.size, len(other)) - 1)
+        tail = other[split:self.max_size]
+        self.view[split:split + len(tail)] = tail
+        self.size = split + len(tail)
+    
+    def mutate_buffer(self, data, splice_with=None):
+        self.load(data)
+        if splice_with is not None:
+            self.splice(splice_with)
+        self.havoc()
+        return self.result()
+    
+    # --- типизированные значения ---
+    
+    def mutate(self, value, splice_with=None):
+        """Мутация значения аргумента с сохранением типа"""
+        if isinstance(value, str):
+            other = splice_with.encode('utf-8', 'replace') if isinstance(splice_with, str) else None
+            data = self.mutate_buffer(value.encode('utf-8', 'replace'), other)
+            return data.decode('utf-8', 'replace')
+        if isinstance(value, (bytes, bytearray)):
+            other = splice_with if isinstance(splice_with, (bytes, bytearray)) else None
+            return type(value)(self.mutate_buffer(value, other))
+        if isinstance(value, bool):
+            return not value
+        if isinstance(value, int):
+            op = _below(5)
+            if op == 4 and DICTIONARY_INTS:
+                return _choice(DICTIONARY_INTS)
+            if op == 0:
+                return _choice(INTERESTING_INTS)
+            elif op == 1:
+                return value + _randint(-35, 35)
+            elif op == 2:
+                return value ^ (1 << _below(64))
+            return -value
+        if isinstance(value, float):
+            if _random() < 0.3:
+                return _choice(INTERESTING_FLOATS)
+            return value * _choice((-1.0, 0.5, 2.0, 1e10)) + _randint(-35, 35)
+        if isinstance(value, list):
+            return self.mutate_list(value)
+        if isinstance(value, tuple):
+            return tuple(self.mutate_list(list(value)))
+        if isinstance(value, dict) and value:
+            key = _choice(list(value))
+            value = dict(value)
+            value[key] = self.mutate(value[key])
+            return value
+        return gen_any()
+    
+    def mutate_list(self, items):
+        op = _below(4) if items else 3
+        if op == 0:
+            pos = _below(len(items))
+            return items[:pos] + [self.mutate(items[pos])] + items[pos + 1:]
+        elif op == 1:
+            pos = _below(len(items))
+            return items[:pos] + items[pos + 1:]
+        elif op == 2:
+            pos = _below(len(items))
+            return items[:pos + 1] + items[pos:]
+        return items + [gen_any()]
+
+
+def benchmark_mutations(seconds=1.0):
+    """Микробенчмарк: новые значения из генераторов против мутаций буфера"""
+    mutator = Mutator()
+    seed_value = gen_str()
+    
+    def single_operation():
+        if mutator.size < 8:
+            mutator.load(b"A" * 100)
+        _choice(mutator.byte_operations)()
+    
+    def measure(operation):
+        count = 0
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            for _ in range(1000):
+                operation()
+            count += 1000
+        return count / seconds
+    
+    results = {{
+        "random.choices string (old fuzz_string)": measure(
+            lambda: ''.join(random.choices(PRINTABLE, k=100))),
+        "gen_str": measure(gen_str),
+        "Mutator single bytearray operation": measure(single_operation),
+        "Mutator.mutate(str)": measure(lambda: mutator.mutate(seed_value)),
+        "Mutator.havoc (bytearray)": measure(lambda: (mutator.load(b"A" * 100), mutator.havoc())),
+        "Mutator.mutate(int)": measure(lambda: mutator.mutate(1000)),
+    }}
+    for label, rate in results.items():
+        print(f"{{label:45s}} {{rate:12,.0f}} ops/sec")
+    return results
+
+
+class CorpusUnpickler(pickle.Unpickler):
+    """Чтение входов корпуса: разрешены только встроенные типы значений"""
+    
+    def find_class(self, module, name):
+        if module == "builtins" and name in CORPUS_BUILTINS:
+            return getattr(builtins, name)
+        raise pickle.UnpicklingError(f"forbidden type in corpus file: {{module}}.{{name}}")
+
+
+def read_corpus_file(path):
+    """Загрузка входа (args, kwargs) из файла корпуса через mmap"""
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            args, kwargs = CorpusUnpickler(data).load()
+    return tuple(args), dict(kwargs)
+
+
+class CorpusStore:
+    """Корпус на диске: каталог на целевую функцию, файл на вход.
+
+    Имя файла - SHA-1 содержимого, поэтому повторные входы не дублируются,
+    а запись через временный файл и os.replace атомарна и безопасна при
+    одновременной работе нескольких рабочих процессов.
+    """
+    
+    def __init__(self, root):
+        self.root = Path(root)
+    
+    def directory(self, name):
+        return self.root / re.sub(r'[^\\w.-]', '_', name)
+    
+    def files(self, name):
+        directory = self.directory(name)
+        if not directory.is_dir():
+            return []
+        return sorted(path for path in directory.iterdir()
+                      if path.is_file() and not path.name.startswith('.'))
+    
+    def load(self, name):
+        """Все читаемые входы цели; поврежденные файлы пропускаются"""
+        inputs = []
+        for path in self.files(name):
+            try:
+                inputs.append(read_corpus_file(path))
+            except (OSError, ValueError, EOFError, TypeError, pickle.UnpicklingError):
+                continue
+        return inputs
+    
+    def save(self, name, fuzz_input, file_name=None):
+        """Атомарная запись входа (существующий файл не перезаписывается).
+
+        Возвращает путь к файлу или None, если вход не сериализуется.
+        """
+        try:
+            data = pickle.dumps(fuzz_input, protocol=4)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return None
+        directory = self.directory(name)
+        path = directory / (file_name or hashlib.sha1(data).hexdigest())
+        if path.exists():
+            return path
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = directory / f".{{path.name}}.{{os.getpid()}}.tmp"
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        return path
+
+
+class FuzzTester:
+    """Класс для fuzzing тестирования Python функций.
+
+    Успешные вызовы учитываются счетчиками по функциям, ошибки - корзинами
+    по сигнатуре, поэтому память не растет с числом итераций. Зависшая цель
+    снимается с прогона на 2 ** N итераций, после HANG_QUARANTINE_LIMIT
+    зависаний - до конца сессии.
+    """
+    
+    def __init__(self, functions=None, coverage=None, dictionary=(), watchdog=None):
+        self.successes = {{}}
+        self.failures = {{}}
+        self.rejected = {{}}
+        self.hangs = {{}}
+        self.buckets = {{}}
+        self.parked = {{}}
+        self.quarantined = {{}}
+        self.watchdog = watchdog
+        self.scheduler = None
+        self.store = None
+        self.crashes = None
+        self.fork_batch = 0
+        self.iteration = 0
+        self.skipped = {{}}
+        self.scores = {{}}
+        self.coverage = coverage
+        self.corpus = {{}}
+        self.instances = {{}}
+        self.mutator = Mutator(dictionary=dictionary)
+        self.targets = self.resolve_targets(FUNCTIONS_TO_FUZZ if functions is None else functions)
+    
+    def instantiate(self, cls, factory_name):
+        """Создание (и кэширование) экземпляра класса для вызова его методов"""
+        if cls in self.instances:
+            return self.instances[cls]
+        
+        factory = ARG_FACTORIES.get(factory_name)
+        instance = None
+        for attempt in range(INSTANCE_ATTEMPTS if factory else 1):
+            args, kwargs = factory() if factory else ((), {{}})
+            try:
+                instance = cls(*args, **kwargs)
+                break
+            except Exception:
+                continue
+        self.instances[cls] = instance
+        return instance
+    
+    def resolve_callable(self, module, func_info):
+        """Вызываемый объект цели или (None, причина пропуска)"""
+        qualname = func_info.get('qualname') or func_info['name']
+        class_name = func_info.get('class')
+        if not class_name:
+            func = getattr(module, qualname, None)
+            if not callable(func) or getattr(func, '__module__', None) != module.__name__:
+                return None, "not a module-level callable"
+            return func, None
+        
+        cls = module
+        for part in class_name.split('.'):
+            cls = getattr(cls, part, None)
+        if not isinstance(cls, type) or cls.__module__ != module.__name__:
+            return None, f"class {{class_name}} not found"
+        
+        # Конструктор фаззится вызовом самого класса
+        method_name = func_info['name']
+        if method_name == '__init__':
+            return cls, None
+        
+        raw = inspect.getattr_static(cls, method_name, None)
+        if isinstance(raw, (staticmethod, classmethod)):
+            return getattr(cls, method_name), None
+        if not inspect.isfunction(raw):
+            return None, "not a plain method"
+        
+        instance = self.instantiate(cls, f"{{module.__name__}}.{{class_name}}.__init__")
+        if instance is None:
+            return None, f"cannot instantiate {{class_name}}"
+        return getattr(instance, method_name), None
+    
+    def resolve_targets(self, functions):
+        """Однократное разрешение целей в таблицу вызовов (name, func, factory).
+
+        Цели, которые не удалось импортировать или найти, попадают в
+        self.skipped и в цикле фаззинга больше не участвуют.
+        """
+        targets = []
+        seen = set()
+        modules = {{}}
+        for file_path, funcs in functions.items():
+            module_name = module_name_for(file_path)
+            if module_name not in modules:
+                try:
+                    modules[module_name] = importlib.import_module(module_name)
+                except (Exception, SystemExit) as e:
+                    modules[module_name] = None
+                    self.skipped[module_name] = f"import failed: {{type(e).__name__}}: {{e}}"
+            module = modules[module_name]
+            if module is None:
+                continue
+            
+            for func_info in funcs:
+                name = f"{{module_name}}.{{func_info.get('qualname') or func_info['name']}}"
+                if name in seen:
+                    continue
+                seen.add(name)
+                func, reason = self.resolve_callable(module, func_info)
+                if func is None:
+                    self.skipped[name] = reason
+                    continue
+                factory = ARG_FACTORIES.get(name) or generic_factory(len(func_info['args']))
+                self.scores[name] = func_info.get('score') or 0.0
+                targets.append((name, func, factory))
+        # Самые перспективные по статической оценке цели идут первыми
+        targets.sort(key=lambda target: -self.scores[target[0]])
+        return targets
+    
+    def mutate_input(self, fuzz_input, corpus):
+        """Мутация одного аргумента (позиционного или именованного) входа.
+
+        С вероятностью SPLICE_PROBABILITY аргумент скрещивается с тем же
+        аргументом другого входа из корпуса.
+        """
+        args, kwargs = fuzz_input
+        slots = len(args) + len(kwargs)
+        if not slots:
+            return fuzz_input
+        
+        other_args, other_kwargs = _choice(corpus) if _random() < SPLICE_PROBABILITY else ((), {{}})
+        pos = _randrange(slots)
+        if pos < len(args):
+            other = other_args[pos] if pos < len(other_args) else None
+            return args[:pos] + (self.mutator.mutate(args[pos], other),) + args[pos + 1:], kwargs
+        key = list(kwargs)[pos - len(args)]
+        kwargs = dict(kwargs)
+        kwargs[key] = self.mutator.mutate(kwargs[key], other_kwargs.get(key))
+        return args, kwargs
+    
+    def next_input(self, name, factory):
+        """Выбор следующего входа: мутация из корпуса или вызов фабрики"""
+        corpus = self.corpus.get(name)
+        if corpus and _random() < CORPUS_PICK_PROBABILITY:
+            return self.mutate_input(_choice(corpus), corpus)
+        return factory()
+    
+    def test_function(self, name, func, fuzz_input):
+        """Тестирование функции на входе (args, kwargs)"""
+        coverage = self.coverage
+        if coverage is not None:
+            coverage.prev = 0
+            edges_before = coverage.edges
+        watchdog = self.watchdog
+        if watchdog is not None:
+            watchdog.call += 1
+        
+        try:
+            # Вызов функции
+            func(*fuzz_input[0], **fuzz_input[1])
+            self.successes[name] = self.successes.get(name, 0) + 1
+            
+        except CallTimeout as e:
+            self.record_hang(name, e, fuzz_input)
+            if coverage is not None and not coverage.restore():
+                print("Warning: coverage tracer could not be restored after a hang", file=sys.stderr)
+        except Exception as e:
+            self.record_error(name, e, fuzz_input)
+        
+        if watchdog is not None:
+            watchdog.call += 1
+        
+        # Входы, открывшие новые ребра, сохраняются в корпус
+        if coverage is not None and coverage.edges != edges_before:
+            self.corpus.setdefault(name, []).append(fuzz_input)
+            if self.store is not None:
+                self.store.save(name, fuzz_input)
+    
+    def load_corpus(self, store):
+        """Подключение корпуса на диске и загрузка сохраненных входов"""
+        self.store = store
+        loaded = 0
+        for name, _, _ in self.targets:
+            inputs = store.load(name)
+            if inputs:
+                self.corpus[name] = inputs
+                loaded += len(inputs)
+        return loaded
+    
+    def replay_corpus(self):
+        """Прогон загруженного корпуса для восстановления карты покрытия"""
+        coverage = self.coverage
+        watchdog = self.watchdog
+        corpus = self.corpus
+        self.corpus = {{}}
+        coverage.start()
+        if watchdog is not None:
+            watchdog.start()
+        try:
+            for name, func, _ in list(self.targets):
+                for fuzz_input in corpus.get(name, ()):
+                    self.test_function(name, func, fuzz_input)
+        finally:
+            if watchdog is not None:
+                watchdog.stop()
+            coverage.stop()
+            self.corpus = corpus
+    
+    def record_error(self, name, exc, args, signature=None):
+        """Учет ошибки в корзине по сигнатуре с одним входом-репродьюсером"""
+        self.failures[name] = self.failures.get(name, 0) + 1
+        if isinstance(exc, ARG_REJECT_ERRORS):
+            self.rejected[name] = self.rejected.get(name, 0) + 1
+        if signature is None:
+            signature = error_signature(exc)
+        bucket = self.buckets.get(signature)
+        if bucket is None:
+            bucket = self.buckets[signature] = {{
+                "id": hashlib.sha1(repr(signature).encode()).hexdigest()[:16],
+                "function": name,
+                "error_type": type(exc).__name__,
+                "message": str(exc)[:200],
+                "frames": [f"{{filename}}:{{lineno}} in {{func_name}}"
+                           for filename, func_name, lineno in signature[1:]],
+                "count": 0,
+                "first_seen": self.iteration,
+                "input": repr(args)
+            }}
+            if self.crashes is not None:
+                path = self.crashes.save(name, args, file_name=bucket["id"])
+                if path is not None:
+                    bucket["reproducer"] = str(path)
+        bucket["count"] += 1
+        bucket["last_seen"] = self.iteration
+    
+    def record_hang(self, name, exc, args):
+        """Учет зависания: корзина с репродьюсером и снятие цели с прогона"""
+        self.record_error(name, exc, args, signature=hang_signature(name))
+        self.penalize(name)
+    
+    def penalize(self, name):
+        """Пауза на 2 ** N итераций после N-го зависания, затем карантин"""
+        count = self.hangs[name] = self.hangs.get(name, 0) + 1
+        target = next((target for target in self.targets if target[0] == name), None)
+        if target is None:
+            return
+        # Список заменяется, а не изменяется, чтобы не сбить текущий проход fuzz_loop
+        self.targets = [other for other in self.targets if other[0] != name]
+        if count >= HANG_QUARANTINE_LIMIT:
+            self.quarantined[name] = self.iteration
+            print(f"Quarantined {{name}} after {{count}} hangs")
+        else:
+            self.parked[name] = (self.iteration + 2 ** count, target)
+    
+    def release_parked(self):
+        """Возврат в прогон целей, отбывших паузу после зависания"""
+        for name, (until, target) in list(self.parked.items()):
+            if until <= self.iteration:
+                del self.parked[name]
+                self.targets = self.targets + [target]
+    
+    def snapshot(self):
+        """Сводная статистика в JSON-совместимом виде"""
+        coverage = self.coverage
+        return {{
+            "successes": dict(self.successes),
+            "failures": dict(self.failures),
+            "rejected": dict(self.rejected),
+            "hangs": dict(self.hangs),
+            "quarantined": sorted(self.quarantined),
+            "buckets": {{bucket["id"]: dict(bucket) for bucket in self.buckets.values()}},
+            "corpus_size": sum(len(inputs) for inputs in self.corpus.values()),
+            "coverage_edges": coverage.edges if coverage is not None else None
+        }}
+
+class EnergyScheduler:
+    """Распределение вызовов между целями по обратной связи (bandit).
+
+    Доля находок (новые ребра покрытия и новые корзины ошибок) на вызов
+    оценивается сэмплированием Томпсона из Beta-распределения и умножается
+    на поправку за скорость выполнения, ограниченную SCHEDULE_SPEED_LIMIT.
+    Редко вызываемые цели имеют широкое распределение и не остаются без
+    бюджета, а статистика затухает, так что исчерпанная цель теряет долю.
+    Статическая оценка генератора задает априорные находки, поэтому в
+    начале сессии бюджет смещен к сложным функциям разбора входа.
+    """
+    
+    def __init__(self, tester):
+        self.tester = tester
+        self.stats = {{}}
+        top = max(tester.scores.values(), default=0.0)
+        self.priors = {{name: SCHEDULE_SCORE_PRIOR * score / top if top else 0.0
+                       for name, score in tester.scores.items()}}
+    
+    def weights(self, targets):
+        """Веса целей на следующую итерацию"""
+        stats = self.stats
+        priors = self.priors
+        rows = []
+        for name, _, _ in targets:
+            row = stats.get(name)
+            if row is None:
+                row = stats[name] = [0.0, 0.0, 0.0]
+            rows.append(row)
+        
+        # Среднее время вызова по целям, у которых оно уже измерено
+        timed = [seconds / calls for calls, seconds, _ in rows if calls]
+        mean_time = sum(timed) / len(timed) if timed else 0.0
+        low, high = 1 / SCHEDULE_SPEED_LIMIT, SCHEDULE_SPEED_LIMIT
+        weights = []
+        for (name, _, _), (calls, seconds, finds) in zip(targets, rows):
+            speed = min(high, max(low, mean_time * calls / seconds)) if seconds else 1.0
+            prior = priors.get(name, 0.0)
+            weights.append(random.betavariate(1 + prior + finds, 1 + calls - finds) * speed)
+        return weights
+    
+    def run_iteration(self):
+        """Одна итерация: столько вызовов, сколько целей, с выбором по весам"""
+        tester = self.tester
+        targets = tester.targets
+        if not targets:
+            return
+        test_function = tester.test_function
+        next_input = tester.next_input
+        coverage = tester.coverage
+        buckets = tester.buckets
+        parked = tester.parked
+        quarantined = tester.quarantined
+        stats = self.stats
+        
+        for name, func, factory in _choices(targets, self.weights(targets), k=len(targets)):
+            # Цель могла зависнуть раньше в этой же итерации
+            if name in parked or name in quarantined:
+                continue
+            found_before = len(buckets) + (coverage.edges if coverage is not None else 0)
+            started = time.perf_counter()
+            test_function(name, func, next_input(name, factory))
+            row = stats[name]
+            row[0] += 1
+            row[1] += time.perf_counter() - started
+            if len(buckets) + (coverage.edges if coverage is not None else 0) != found_before:
+                row[2] += 1
+        
+        for row in stats.values():
+            row[0] *= SCHEDULE_DECAY
+            row[1] *= SCHEDULE_DECAY
+            row[2] *= SCHEDULE_DECAY
+
+
+# Обнаруженные функции для фаззинга
+FUNCTIONS_TO_FUZZ = {pprint.pformat(function_table, width=120, sort_dicts=False)}
+
+# Специализированные фабрики аргументов (сгенерированы по сигнатурам)
+{arg_factories}
+
+# Цели TestOneInput (разрешаются при первом вызове)
+ENTRY_TARGETS = []
+
+
+def entry_targets():
+    """Цели для TestOneInput; переменная окружения FUZZ_TARGET оставляет одну"""
+    if not ENTRY_TARGETS:
+        selected = os.environ.get("FUZZ_TARGET")
+        targets = [target for target in FuzzTester().targets if not selected or target[0] == selected]
+        if not targets:
+            raise ValueError(f"No fuzz target matches {{selected!r}}")
+        ENTRY_TARGETS[:] = targets
+    return ENTRY_TARGETS
+
+
+def TestOneInput(data):
+    """Точка входа в стиле libFuzzer/atheris: байты входа -> аргументы цели.
+
+    При нескольких целях первый байт выбирает цель. Исключения цели
+    пробрасываются как находка, кроме отказа на проверке аргументов.
+    """
+    targets = entry_targets()
+    if len(targets) > 1 and data:
+        name, func, factory = targets[data[0] % len(targets)]
+        data = data[1:]
+    else:
+        name, func, factory = targets[0]
+    args, kwargs = decode_input(data, factory)
+    try:
+        func(*args, **kwargs)
+    except ARG_REJECT_ERRORS:
+        pass
+
+
+def fuzz_loop(tester, iterations, on_iteration=None):
+    """Основной цикл фаззинга по таблице целей"""
+    if tester.fork_batch:
+        return fork_server_loop(tester, iterations, on_iteration)
+    test_function = tester.test_function
+    next_input = tester.next_input
+    coverage = tester.coverage
+    watchdog = tester.watchdog
+    if coverage is not None:
+        coverage.start()
+    if watchdog is not None:
+        watchdog.start()
+    
+    try:
+        for i in range(iterations):
+            tester.iteration = i
+            if tester.parked:
+                tester.release_parked()
+            if tester.scheduler is not None:
+                tester.scheduler.run_iteration()
+            else:
+                for name, func, factory in tester.targets:
+                    test_function(name, func, next_input(name, factory))
+            
+            if on_iteration is not None:
+                on_iteration(i)
+    finally:
+        if watchdog is not None:
+            watchdog.stop()
+        if coverage is not None:
+            coverage.stop()
+
+
+def _fork_child(tester, batch, progress, write_fd):
+    """Тело дочернего процесса fork-сервера: пакет вызовов и отчет родителю"""
+    tester.successes, tester.failures, tester.rejected, tester.hangs = {{}}, {{}}, {{}}, {{}}
+    tester.buckets = {{}}
+    coverage = tester.coverage
+    watchdog = tester.watchdog
+    bitmap_before = bytes(coverage.bitmap) if coverage is not None else None
+    if watchdog is not None:
+        watchdog.start()
+    
+    corpus_hits = []
+    for index, (iteration, name, func, fuzz_input) in enumerate(batch):
+        struct.pack_into('<q', progress, 0, index)
+        tester.iteration = iteration
+        edges_before = coverage.edges if coverage is not None else 0
+        tester.test_function(name, func, fuzz_input)
+        if coverage is not None and coverage.edges != edges_before:
+            corpus_hits.append(index)
+    
+    if watchdog is not None:
+        watchdog.stop()
+    new_edges = []
+    if corpus_hits:
+        # Биты карты только взводятся, поэтому XOR дает ровно новые ребра
+        changed = (int.from_bytes(coverage.bitmap, 'little') ^
+                   int.from_bytes(bitmap_before, 'little')).to_bytes(MAP_SIZE, 'little')
+        pos = changed.find(1)
+        while pos >= 0:
+            new_edges.append(pos)
+            pos = changed.find(1, pos + 1)
+    
+    report = {{
+        "successes": tester.successes,
+        "failures": tester.failures,
+        "rejected": tester.rejected,
+        "hangs": tester.hangs,
+        "buckets": tester.buckets,
+        "corpus": corpus_hits,
+        "edges": new_edges
+    }}
+    with os.fdopen(write_fd, 'wb') as stream:
+        stream.write(pickle.dumps(report, protocol=4))
+
+
+def merge_fork_report(tester, batch, report):
+    """Перенос результатов пакета из дочернего процесса в состояние сервера"""
+    for key in ("successes", "failures", "rejected"):
+        counts = getattr(tester, key)
+        for name, count in report[key].items():
+            counts[name] = counts.get(name, 0) + count
+    
+    for signature, bucket in report["buckets"].items():
+        known = tester.buckets.get(signature)
+        if known is None:
+            tester.buckets[signature] = bucket
+            continue
+        known["count"] += bucket["count"]
+        known["last_seen"] = max(known["last_seen"], bucket["last_seen"])
+    
+    for name, count in report["hangs"].items():
+        for _ in range(count):
+            tester.penalize(name)
+    
+    for index in report["corpus"]:
+        _, name, _, fuzz_input = batch[index]
+        tester.corpus.setdefault(name, []).append(fuzz_input)
+    
+    coverage = tester.coverage
+    if coverage is not None:
+        bitmap = coverage.bitmap
+        for idx in report["edges"]:
+            if not bitmap[idx]:
+                bitmap[idx] = 1
+                coverage.edges += 1
+
+
+def run_fork_batch(tester, batch, progress):
+    """Выполнение пакета вызовов в дочерних процессах fork-сервера.
+
+    Родитель ждет отчет с таймаутом FORK_CHILD_TIMEOUT. Если процесс погиб
+    или завис, вход, на котором это случилось, берется из общей памяти
+    progress и учитывается как отдельная корзина, а остаток пакета
+    выполняется в новом дочернем процессе.
+    """
+    while batch:
+        struct.pack_into('<q', progress, 0, -1)
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            exit_code = 0
+            try:
+                _fork_child(tester, batch, progress, write_fd)
+            except BaseException:
+                traceback.print_exc()
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        
+        os.close(write_fd)
+        chunks = []
+        hung = False
+        deadline = time.monotonic() + FORK_CHILD_TIMEOUT
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([read_fd], [], [], remaining)[0]:
+                os.kill(pid, signal.SIGKILL)
+                hung = True
+                break
+            chunk = os.read(read_fd, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        os.close(read_fd)
+        _, status = os.waitpid(pid, 0)
+        
+        if chunks and not hung:
+            try:
+                merge_fork_report(tester, batch, pickle.loads(b"".join(chunks)))
+                return
+            except (pickle.UnpicklingError, EOFError):
+                pass
+        
+        index = struct.unpack_from('<q', progress, 0)[0]
+        if index < 0:
+            return
+        _, name, _, fuzz_input = batch[index]
+        if hung:
+            exc = CallTimeout(f"child killed after {{FORK_CHILD_TIMEOUT}}s")
+            reason = "timeout"
+        else:
+            code = os.waitstatus_to_exitcode(status)
+            reason = f"killed by {{signal.Signals(-code).name}}" if code < 0 else f"exit code {{code}}"
+            exc = ChildCrash(reason)
+        signature = hang_signature(name) if hung else ("ChildCrash", ("<fork-server>", f"{{name}}: {{reason}}", 0))
+        tester.record_error(name, exc, fuzz_input, signature=signature)
+        if hung:
+            tester.penalize(name)
+        # Вызовы до сбоя потеряли свои результаты вместе с процессом, повторяется только хвост
+        batch = batch[index + 1:]
+
+
+def fork_server_loop(tester, iterations, on_iteration=None):
+    """Цикл fork-сервера: проект импортирован один раз, вызовы идут в дочерних процессах.
+
+    Входы генерируются и мутируются в сервере, каждый пакет из fork_batch
+    вызовов выполняется в свежей копии процесса, поэтому изменения
+    глобального состояния и утечки памяти целей не переживают пакет.
+    """
+    coverage = tester.coverage
+    batch_size = tester.fork_batch
+    progress = mmap.mmap(-1, 8)
+    batch = []
+    if coverage is not None:
+        coverage.start()
+    
+    try:
+        for i in range(iterations):
+            tester.iteration = i
+            if tester.parked:
+                tester.release_parked()
+            for name, func, factory in tester.targets:
+                batch.append((i, name, func, tester.next_input(name, factory)))
+                if len(batch) >= batch_size:
+                    run_fork_batch(tester, batch, progress)
+                    batch = []
+            
+            if on_iteration is not None:
+                on_iteration(i)
+        if batch:
+            run_fork_batch(tester, batch, progress)
+    finally:
+        if coverage is not None:
+            coverage.stop()
+        progress.close()
+
+
+def merge_snapshot(total, snapshot):
+    """Слияние статистики рабочего процесса в общую"""
+    for key in ("successes", "failures", "rejected", "hangs"):
+        counts = total[key]
+        for name, count in snapshot[key].items():
+            counts[name] = counts.get(name, 0) + count
+    total["quarantined"] = sorted(set(total["quarantined"]) | set(snapshot["quarantined"]))
+    
+    buckets = total["buckets"]
+    for bucket_id, bucket in snapshot["buckets"].items():
+        known = buckets.get(bucket_id)
+        if known is None:
+            buckets[bucket_id] = dict(bucket)
+            continue
+        known["count"] += bucket["count"]
+        known["first_seen"] = min(known["first_seen"], bucket["first_seen"])
+        known["last_seen"] = max(known["last_seen"], bucket["last_seen"])
+    
+    total["corpus_size"] += snapshot["corpus_size"]
+
+
+def print_budget_shares(stats, limit=10):
+    """Доли вызовов по функциям (итог работы планировщика)"""
+    calls = {{name: count + stats["failures"].get(name, 0) for name, count in stats["successes"].items()}}
+    for name, count in stats["failures"].items():
+        calls.setdefault(name, count)
+    total = sum(calls.values())
+    if not total:
+        return
+    ranked = sorted(calls.items(), key=lambda item: -item[1])
+    print("\\nBudget shares:")
+    for name, count in ranked[:limit]:
+        print(f"  - {{name}}: {{count / total:.1%}} ({{count}} calls)")
+    if len(ranked) > limit:
+        rest = sum(count for _, count in ranked[limit:])
+        print(f"  ... {{len(ranked) - limit}} more functions: {{rest / total:.1%}}")
+
+
+def print_summary(stats):
+    """Вывод итогов сессии"""
+    buckets = sorted(stats["buckets"].values(), key=lambda bucket: -bucket["count"])
+    successes = sum(stats["successes"].values())
+    failures = sum(stats["failures"].values())
+    total_calls = successes + failures
+    accepted = total_calls - sum(stats["rejected"].values())
+    print(f"\\nFuzzing completed!")
+    print(f"Successful calls: {{successes}}")
+    print(f"Errors found: {{failures}} in {{len(buckets)}} unique buckets")
+    if total_calls:
+        print(f"Calls past argument validation: {{accepted / total_calls:.1%}} "
+              f"({{accepted}}/{{total_calls}})")
+    hangs = sum(stats["hangs"].values())
+    if hangs:
+        print(f"Hangs: {{hangs}} in {{len(stats['hangs'])}} functions")
+    if stats["quarantined"]:
+        print(f"Quarantined: {{', '.join(stats['quarantined'])}}")
+    if stats["coverage_edges"] is not None:
+        print(f"Coverage edges: {{stats['coverage_edges']}}")
+        print(f"Corpus size: {{stats['corpus_size']}}")
+    
+    if buckets:
+        print("\\nErrors detected:")
+        for bucket in buckets[:5]:
+            print(f"  - {{bucket['function']}}: {{bucket['error_type']}} x{{bucket['count']}} "
+                  f"(iterations {{bucket['first_seen']}}-{{bucket['last_seen']}}, "
+                  f"input {{bucket['input'][:80]}})")
+            if "reproducer" in bucket:
+                print(f"    reproducer: {{bucket['reproducer']}}")
+
+
+def rss_bytes(pid="self"):
+    """Текущий RSS процесса по /proc (None, если /proc недоступен)"""
+    try:
+        with open(f"/proc/{{pid}}/statm") as f:
+            return int(f.read().split()[1]) * mmap.PAGESIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def empty_stats():
+    """Пустая сводная статистика для слияния снимков"""
+    return {{
+        "successes": {{}}, "failures": {{}}, "rejected": {{}}, "hangs": {{}}, "quarantined": [],
+        "buckets": {{}}, "corpus_size": 0, "coverage_edges": None
+    }}
+
+
+class StatsFeed:
+    """Машиночитаемый поток статистики в формате JSON Lines.
+
+    Запись не чаще раза в interval секунд, одной операцией записи на
+    строку, в файл (дозапись) или уже открытый файловый дескриптор.
+    """
+    
+    def __init__(self, path=None, fd=None, interval=STATS_INTERVAL):
+        if fd is not None:
+            self.stream = os.fdopen(fd, 'w', encoding='utf-8', buffering=1 << 16, closefd=False)
+        else:
+            self.stream = open(path, 'a', encoding='utf-8', buffering=1 << 16)
+        self.interval = interval
+        self.started = self.last_time = time.monotonic()
+        self.next_write = self.started + interval
+        self.last_execs = 0
+    
+    def due(self):
+        return time.monotonic() >= self.next_write
+    
+    def write(self, stats, done, kind="stats", rss=None):
+        """Запись одной строки по сводной статистике (формат snapshot)"""
+        now = time.monotonic()
+        functions = {{}}
+        for key in ("successes", "failures", "rejected", "hangs"):
+            for name, count in stats[key].items():
+                counts = functions.setdefault(name, {{"calls": 0, "failures": 0, "rejected": 0, "hangs": 0}})
+                if key == "successes":
+                    counts["calls"] += count
+                else:
+                    counts[key] += count
+                    if key == "failures":
+                        counts["calls"] += count
+        execs = sum(counts["calls"] for counts in functions.values())
+        
+        record = {{
+            "type": kind,
+            "time": round(time.time(), 3),
+            "elapsed": round(now - self.started, 3),
+            "iterations": done,
+            "execs": execs,
+            "execs_per_sec": round(execs / max(now - self.started, 1e-9), 1),
+            # Итоговая запись сводит точные счетчики с запаздывающими снимками, темп за интервал не имеет смысла
+            "interval_execs_per_sec": (round((execs - self.last_execs) / max(now - self.last_time, 1e-9), 1)
+                                       if kind == "stats" else None),
+            "coverage_edges": stats["coverage_edges"],
+            "corpus_size": stats["corpus_size"],
+            "rss_bytes": rss if rss is not None else rss_bytes(),
+            "quarantined": stats["quarantined"],
+            "functions": functions,
+            "buckets": list(stats["buckets"].values())
+        }}
+        self.stream.write(json.dumps(record) + "\\n")
+        self.stream.flush()
+        self.last_time, self.last_execs = now, execs
+        self.next_write = now + self.interval
+    
+    def close(self):
+        self.stream.close()
+
+
+def _worker_main(tester, seed, iterations, write_fd, inflight):
+    """Тело рабочего процесса: фаззинг своей доли итераций с собственным seed.
+
+    Перед каждым вызовом вход записывается в общую память inflight, чтобы
+    родитель мог сохранить репродьюсер, если процесс погибнет на вызове.
+    Сообщение о ходе работы со статистикой отправляется из каждого вызова
+    не чаще WORKER_HEARTBEAT_INTERVAL, так что медленная итерация по
+    многим целям не выглядит для родителя зависанием.
+    """
+    random.seed(seed)
+    stream = os.fdopen(write_fd, 'w', encoding='utf-8')
+    last_heartbeat = time.monotonic()
+    worker_pid = os.getpid()
+    inherited = sum(len(inputs) for inputs in tester.corpus.values())
+    # Счетчики родителя (прогон корпуса, падения процессов) он учитывает сам
+    tester.successes, tester.failures, tester.rejected, tester.hangs = {{}}, {{}}, {{}}, {{}}
+    tester.buckets = {{}}
+    test_function = tester.test_function
+    capacity = len(inflight) - WORKER_INFLIGHT_HEADER.size
+    
+    def snapshot():
+        # Корпус, унаследованный при fork, родитель учитывает один раз сам
+        stats = tester.snapshot()
+        stats["corpus_size"] -= inherited
+        return stats
+    
+    def heartbeat(done):
+        nonlocal last_heartbeat
+        now = time.monotonic()
+        # Дочерние процессы fork-сервера наследуют поток, но сообщения шлет только сам рабочий процесс
+        if now - last_heartbeat >= WORKER_HEARTBEAT_INTERVAL and os.getpid() == worker_pid:
+            last_heartbeat = now
+            stream.write(json.dumps({{"type": "progress", "done": done, "stats": snapshot()}}) + "\\n")
+            stream.flush()
+    
+    def tracked_call(name, func, fuzz_input):
+        heartbeat(tester.iteration)
+        payload = pickle.dumps((name, fuzz_input), protocol=4)
+        if len(payload) > capacity:
+            payload = pickle.dumps((name, None), protocol=4)
+        inflight[WORKER_INFLIGHT_HEADER.size:WORKER_INFLIGHT_HEADER.size + len(payload)] = payload
+        WORKER_INFLIGHT_HEADER.pack_into(inflight, 0, len(payload))
+        test_function(name, func, fuzz_input)
+        WORKER_INFLIGHT_HEADER.pack_into(inflight, 0, 0)
+    
+    # Атрибут экземпляра перекрывает метод и для fuzz_loop, и для планировщика
+    tester.test_function = tracked_call
+    fuzz_loop(tester, iterations, lambda i: heartbeat(i + 1))
+    
+    coverage = tester.coverage
+    stream.write(json.dumps({{
+        "type": "result",
+        "done": iterations,
+        "stats": snapshot(),
+        "bitmap": base64.b64encode(bytes(coverage.bitmap)).decode() if coverage is not None else None
+    }}) + "\\n")
+    stream.close()
+
+
+def run_worker_pool(tester, iterations, workers, seed, worker_timeout=60.0, feed=None):
+    """Запуск N рабочих процессов через fork после однократного импорта проекта.
+
+    Каждый процесс получает непересекающийся seed и свою долю итераций.
+    Упавший или зависший процесс перезапускается с оставшимися итерациями,
+    остальные продолжают работу. Вход, на котором процесс погиб, берется
+    из общей памяти inflight и учитывается как отдельная корзина
+    ChildCrash (CallTimeout для зависшего процесса) с репродьюсером.
+    """
+    # Статистика родителя (прогон корпуса) плюс то, что добавят рабочие процессы
+    totals = empty_stats()
+    merge_snapshot(totals, tester.snapshot())
+    totals.update(restarts=0, completed=0, gave_up=0)
+    bitmap = bytearray(MAP_SIZE)
+    selector = selectors.DefaultSelector()
+    slots = {{}}
+    
+    def spawn(worker_id, remaining, generation):
+        read_fd, write_fd = os.pipe()
+        inflight = mmap.mmap(-1, WORKER_INFLIGHT_BYTES)
+        # Непересекающиеся seed для всех процессов и их перезапусков
+        worker_seed = seed + worker_id + generation * workers
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            exit_code = 0
+            try:
+                _worker_main(tester, worker_seed, remaining, write_fd, inflight)
+            except BaseException:
+                traceback.print_exc()
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        
+        os.close(write_fd)
+        slot = {{
+            "id": worker_id, "pid": pid, "fd": read_fd, "buffer": b"", "inflight": inflight,
+            "remaining": remaining, "done": 0, "generation": generation,
+            "finished": False, "last_seen": time.monotonic()
+        }}
+        slots[read_fd] = slot
+        selector.register(read_fd, selectors.EVENT_READ, slot)
+    
+    def record_death(slot, status, hung):
+        # Вход, на котором процесс погиб; 0 - вызов не шел
+        inflight = slot["inflight"]
+        size = WORKER_INFLIGHT_HEADER.unpack_from(inflight, 0)[0]
+        if not size:
+            return
+        offset = WORKER_INFLIGHT_HEADER.size
+        name, fuzz_input = pickle.loads(inflight[offset:offset + size])
+        if hung:
+            exc = CallTimeout(f"worker killed after {{worker_timeout}}s without heartbeat")
+            reason = "timeout"
+        else:
+            code = os.waitstatus_to_exitcode(status)
+            reason = f"killed by {{signal.Signals(-code).name}}" if code < 0 else f"exit code {{code}}"
+            exc = ChildCrash(reason)
+        signature = hang_signature(name) if hung else ("ChildCrash", ("<worker>", f"{{name}}: {{reason}}", 0))
+        tester.iteration = slot["done"]
+        crashes = tester.crashes
+        if fuzz_input is None:
+            # Вход не поместился в inflight: корзина без репродьюсера
+            tester.crashes = None
+        try:
+            tester.record_error(name, exc, fuzz_input, signature=signature)
+        finally:
+            tester.crashes = crashes
+        bucket = tester.buckets[signature]
+        merge_snapshot(totals, {{
+            "successes": {{}}, "failures": {{name: 1}}, "rejected": {{}}, "hangs": {{name: 1}} if hung else {{}},
+            "quarantined": [], "buckets": {{bucket["id"]: dict(bucket, count=1)}}, "corpus_size": 0
+        }})
+        print(f"Worker {{slot['id']}} died on {{name}} ({{reason}})")
+    
+    def retire(slot, kill=False):
+        selector.unregister(slot["fd"])
+        os.close(slot["fd"])
+        del slots[slot["fd"]]
+        if kill:
+            try:
+                os.kill(slot["pid"], signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        _, status = os.waitpid(slot["pid"], 0)
+        totals["completed"] += slot["done"]
+        if not slot["finished"]:
+            # Итог процесс не прислал: учитывается его последний снимок и вход, на котором он погиб
+            if "stats" in slot:
+                merge_snapshot(totals, slot["stats"])
+            record_death(slot, status, kill)
+        slot["inflight"].close()
+        
+        remaining = slot["remaining"] - slot["done"]
+        if slot["finished"] or remaining <= 0:
+            return
+        if slot["generation"] >= MAX_WORKER_RESTARTS:
+            print(f"Worker {{slot['id']}} gave up after {{MAX_WORKER_RESTARTS}} restarts")
+            totals["gave_up"] += 1
+            return
+        reason = "hung" if kill else "crashed"
+        print(f"Worker {{slot['id']}} {{reason}}, restarting with {{remaining}} iterations left")
+        totals["restarts"] += 1
+        spawn(slot["id"], remaining, slot["generation"] + 1)
+    
+    def handle_message(slot, message):
+        if message["type"] == "progress":
+            slot["done"] = message["done"]
+            if "stats" in message:
+                slot["stats"] = message["stats"]
+            return
+        slot["done"] = message["done"]
+        slot["finished"] = True
+        merge_snapshot(totals, message["stats"])
+        if message["bitmap"]:
+            for idx, value in enumerate(base64.b64decode(message["bitmap"])):
+                if value:
+                    bitmap[idx] = 1
+    
+    def live_stats():
+        # Итоги завершенных процессов плюс последние снимки работающих
+        stats = empty_stats()
+        merge_snapshot(stats, totals)
+        edges = MAP_SIZE - bitmap.count(0) if tester.coverage is not None else None
+        for slot in slots.values():
+            if not slot["finished"] and "stats" in slot:
+                merge_snapshot(stats, slot["stats"])
+                if edges is not None:
+                    edges = max(edges, slot["stats"]["coverage_edges"])
+        stats["coverage_edges"] = edges
+        return stats
+    
+    def pool_rss():
+        sizes = [rss_bytes()] + [rss_bytes(slot["pid"]) for slot in slots.values()]
+        return sum(size for size in sizes if size is not None)
+    
+    for worker_id in range(workers):
+        share = iterations // workers + (1 if worker_id < iterations % workers else 0)
+        if share:
+            spawn(worker_id, share, 0)
+    
+    last_report = time.monotonic()
+    while slots:
+        for key, _ in selector.select(timeout=1.0):
+            slot = key.data
+            chunk = os.read(slot["fd"], 65536)
+            if not chunk:
+                retire(slot)
+                continue
+            slot["last_seen"] = time.monotonic()
+            slot["buffer"] += chunk
+            *lines, slot["buffer"] = slot["buffer"].split(b"\\n")
+            for line in lines:
+                handle_message(slot, json.loads(line))
+        
+        now = time.monotonic()
+        for slot in list(slots.values()):
+            if not slot["finished"] and now - slot["last_seen"] > worker_timeout:
+                retire(slot, kill=True)
+        
+        if now - last_report >= 5.0:
+            last_report = now
+            done = totals["completed"] + sum(slot["done"] for slot in slots.values())
+            print(f"Progress: {{done}}/{{iterations}} iterations completed, "
+                  f"{{len(slots)}} workers running, {{totals['restarts']}} restarts")
+        
+        if feed is not None and feed.due():
+            done = totals["completed"] + sum(slot["done"] for slot in slots.values())
+            feed.write(live_stats(), done, rss=pool_rss())
+    
+    selector.close()
+    if tester.coverage is not None:
+        totals["coverage_edges"] = sum(1 for value in bitmap if value)
+    return totals
+
+
+# Состояние процессов cmin и minimize (наследуется при fork)
+POOL_TESTER = None
+
+
+def _pool_init():
+    """Запуск инструментации в процессе пула cmin/minimize"""
+    tester = POOL_TESTER
+    if tester.coverage is not None:
+        tester.coverage.start()
+    if tester.watchdog is not None:
+        tester.watchdog.start()
+
+
+def _cmin_job(job):
+    """Ребра покрытия одного входа корпуса (в рабочем процессе)"""
+    index, path = job
+    tester = POOL_TESTER
+    name, func, _ = tester.targets[index]
+    coverage = tester.coverage
+    watchdog = tester.watchdog
+    try:
+        args, kwargs = read_corpus_file(path)
+    except (OSError, ValueError, EOFError, TypeError, pickle.UnpicklingError):
+        return name, path, None
+    
+    coverage.bitmap = bitmap = bytearray(MAP_SIZE)
+    coverage.prev = 0
+    if watchdog is not None:
+        watchdog.call += 1
+    try:
+        func(*args, **kwargs)
+    except CallTimeout:
+        # Покрытие прерванного вызова неполное, а трассировщик мог быть снят
+        coverage.restore()
+        return name, path, None
+    except Exception:
+        pass
+    finally:
+        if watchdog is not None:
+            watchdog.call += 1
+    if not coverage.restore():
+        return name, path, None
+    
+    edges = []
+    pos = bitmap.find(1)
+    while pos >= 0:
+        edges.append(pos)
+        pos = bitmap.find(1, pos + 1)
+    return name, path, edges
+
+
+def minimize_corpus(corpus_dir, jobs=None, timeout=CALL_TIMEOUT):
+    """Сжатие корпуса до минимального набора с тем же покрытием (как afl-cmin).
+
+    Покрытие входов считается параллельно в процессах, затем для каждой
+    цели входы перебираются от меньших к большим и остаются только те,
+    что добавляют новые ребра. Лишние файлы удаляются из корпуса; входы
+    без измеренного покрытия (зависание, снятый трассировщик, пустая карта)
+    всегда сохраняются.
+    """
+    global POOL_TESTER
+    store = CorpusStore(corpus_dir)
+    watchdog = HangWatchdog(timeout) if timeout and hasattr(signal, "setitimer") else None
+    tester = FuzzTester(coverage=CoverageMap(), watchdog=watchdog)
+    POOL_TESTER = tester
+    
+    work = [(index, path) for index, (name, _, _) in enumerate(tester.targets)
+            for path in store.files(name)]
+    print(f"Minimizing {{len(work)}} corpus inputs over {{len(tester.targets)}} targets...")
+    results = {{}}
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context, initializer=_pool_init) as executor:
+        for name, path, edges in executor.map(_cmin_job, work, chunksize=16):
+            results.setdefault(name, []).append((path, edges))
+    
+    kept_total = removed_total = unmeasured_total = 0
+    for name, entries in results.items():
+        entries.sort(key=lambda entry: (entry[0].stat().st_size, entry[0].name))
+        covered = set()
+        kept = 0
+        for path, edges in entries:
+            if not edges:
+                # Без покрытия нельзя доказать избыточность входа
+                unmeasured_total += 1
+                kept += 1
+                continue
+            if not covered.issuperset(edges):
+                covered.update(edges)
+                kept += 1
+                continue
+            path.unlink()
+            removed_total += 1
+        kept_total += kept
+        print(f"  - {{name}}: {{len(entries)}} -> {{kept}} inputs, {{len(covered)}} edges")
+    
+    if unmeasured_total:
+        print(f"Warning: {{unmeasured_total}} inputs without measured coverage were kept", file=sys.stderr)
+    print(f"\\nCorpus minimized: kept {{kept_total}}, removed {{removed_total}}")
+    return kept_total
+
+
+def _minimize_job(job):
+    """Сигнатура ошибки цели на входе-кандидате или None (в рабочем процессе)"""
+    index, (args, kwargs) = job
+    tester = POOL_TESTER
+    name, func, _ = tester.targets[index]
+    watchdog = tester.watchdog
+    if watchdog is not None:
+        watchdog.call += 1
+    try:
+        func(*args, **kwargs)
+        signature = None
+    except CallTimeout:
+        signature = hang_signature(name)
+        if tester.coverage is not None:
+            tester.coverage.restore()
+    except Exception as e:
+        signature = error_signature(e)
+    if watchdog is not None:
+        watchdog.call += 1
+    return signature
+
+
+def _with_item(seq, index, item):
+    return seq[:index] + type(seq)((item,)) + seq[index + 1:]
+
+
+def _with_slot(fuzz_input, slot, value):
+    args, kwargs = fuzz_input
+    if isinstance(slot, int):
+        return _with_item(args, slot, value), kwargs
+    kwargs = dict(kwargs)
+    kwargs[slot] = value
+    return args, kwargs
+
+
+def ddmin(items, check):
+    """Delta debugging (ddmin) последовательности.
+
+    check(кандидаты) проверяет пакет кандидатов разом и возвращает индекс
+    первого, на котором сбой воспроизводится, или -1.
+    """
+    if items and check([items[:0]]) == 0:
+        return items[:0]
+    n = 2
+    while len(items) >= 2:
+        size = -(-len(items) // n)
+        starts = range(0, len(items), size)
+        subsets = [items[i:i + size] for i in starts]
+        complements = [items[:i] + items[i + size:] for i in starts] if n > 2 else []
+        candidates = subsets + complements
+        found = check(candidates)
+        if found >= 0:
+            items = candidates[found]
+            n = 2 if found < len(subsets) else max(n - 1, 2)
+        elif n < len(items):
+            n = min(len(items), n * 2)
+        else:
+            break
+    return items
+
+
+def shrink_value(value, check):
+    """Упрощение одного значения аргумента с сохранением сбоя"""
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, int):
+        candidates = []
+        current = value
+        while current not in (0, -1):
+            current = -(-current // 2) if current < 0 else current // 2
+            candidates.append(current)
+        candidates = [0] + candidates[::-1]
+        found = check(candidates)
+        return candidates[found] if found >= 0 else value
+    if isinstance(value, float):
+        candidates = [0.0] + ([float(int(value))] if math.isfinite(value) else [])
+        found = check(candidates)
+        return candidates[found] if found >= 0 else value
+    if isinstance(value, dict):
+        keys = ddmin(list(value), lambda subsets: check([{{key: value[key] for key in keys}}
+                                                        for keys in subsets]))
+        return {{key: value[key] for key in keys}}
+    if isinstance(value, (str, bytes, bytearray, list, tuple)):
+        value = ddmin(value, check)
+        if isinstance(value, (list, tuple)):
+            for index in range(len(value)):
+                item = shrink_value(value[index], lambda items: check(
+                    [_with_item(value, index, item) for item in items]))
+                value = _with_item(value, index, item)
+        return value
+    return value
+
+
+def minimize_input(fuzz_input, check):
+    """Минимизация входа (args, kwargs) до неподвижной точки.
+
+    Сначала отбрасываются необязательные именованные аргументы, затем
+    упрощается каждое значение; проход повторяется, пока вход меняется.
+    """
+    while True:
+        previous = fuzz_input
+        args, kwargs = fuzz_input
+        keys = ddmin(list(kwargs), lambda subsets: check([(args, {{key: kwargs[key] for key in keys}})
+                                                           for keys in subsets]))
+        fuzz_input = (args, {{key: kwargs[key] for key in keys}})
+        for slot in list(range(len(args))) + keys:
+            base = fuzz_input
+            value = base[0][slot] if isinstance(slot, int) else base[1][slot]
+            value = shrink_value(value, lambda values: check([_with_slot(base, slot, value)
+                                                              for value in values]))
+            fuzz_input = _with_slot(fuzz_input, slot, value)
+        if repr(fuzz_input) == repr(previous):
+            return fuzz_input
+
+
+def minimize_crash(crash_file, jobs=None, timeout=CALL_TIMEOUT, output=None):
+    """Параллельная минимизация репродьюсера, пока сохраняется его корзина"""
+    global POOL_TESTER
+    crash_file = Path(crash_file)
+    watchdog = HangWatchdog(timeout) if timeout and hasattr(signal, "setitimer") else None
+    tester = FuzzTester(watchdog=watchdog)
+    store = CorpusStore(crash_file.parent.parent)
+    index = next((index for index, (name, _, _) in enumerate(tester.targets)
+                  if store.directory(name).name == crash_file.parent.name), None)
+    if index is None:
+        print(f"No fuzz target matches {{crash_file.parent.name}}")
+        return None
+    POOL_TESTER = tester
+    fuzz_input = read_corpus_file(crash_file)
+    name = tester.targets[index][0]
+    
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context, initializer=_pool_init) as executor:
+        signature = executor.submit(_minimize_job, (index, fuzz_input)).result()
+        if signature is None:
+            print(f"{{crash_file}} does not reproduce a crash in {{name}}")
+            return None
+        print(f"Minimizing {{signature[0]}} in {{name}} (input {{len(repr(fuzz_input))}} chars)...")
+        tests = 0
+        
+        def check(candidates):
+            nonlocal tests
+            tests += len(candidates)
+            jobs_batch = [(index, candidate) for candidate in candidates]
+            for found, result in enumerate(executor.map(_minimize_job, jobs_batch)):
+                if result == signature:
+                    return found
+            return -1
+        
+        minimized = minimize_input(fuzz_input, check)
+    
+    output = Path(output) if output else crash_file.with_name(crash_file.name + ".min")
+    output.write_bytes(pickle.dumps(minimized, protocol=4))
+    print(f"Minimized in {{tests}} tests: {{len(repr(fuzz_input))}} -> {{len(repr(minimized))}} chars")
+    print(f"Input: {{repr(minimized)[:200]}}")
+    print(f"Written to {{output}}")
+    return minimized
+
+
+def run_fuzzing_session(iterations=100, coverage_guided=False, workers=1, seed=None,
+                        worker_timeout=60.0, dictionary_file=DICTIONARY_FILE, timeout=CALL_TIMEOUT,
+                        schedule="round-robin", corpus_dir=None, crash_dir=CRASH_DIR, fork_batch=0,
+                        stats_file=None, stats_fd=None, stats_interval=STATS_INTERVAL):
+    """Запуск сессии фаззинга"""
+    dictionary = load_dictionary(dictionary_file) if dictionary_file else []
+    use_dictionary(dictionary)
+    coverage = CoverageMap() if coverage_guided else None
+    watchdog = HangWatchdog(timeout) if timeout and hasattr(signal, "setitimer") else None
+    tester = FuzzTester(coverage=coverage, dictionary=dictionary, watchdog=watchdog)
+    if schedule == "bandit":
+        tester.scheduler = EnergyScheduler(tester)
+    if crash_dir:
+        tester.crashes = CorpusStore(crash_dir)
+    tester.fork_batch = fork_batch
+    
+    if dictionary:
+        print(f"Loaded {{len(dictionary)}} dictionary tokens from {{dictionary_file}}")
+    if tester.skipped:
+        print(f"Skipping {{len(tester.skipped)}} unresolvable targets:")
+        for name, reason in list(tester.skipped.items())[:10]:
+            print(f"  - {{name}}: {{reason}}")
+    
+    print(f"Starting Python fuzzing session with {{iterations}} iterations "
+          f"over {{len(tester.targets)}} targets...")
+    if coverage is not None:
+        print(f"Coverage-guided mode enabled ({{coverage.backend}})")
+    if tester.scheduler is not None:
+        print(f"Energy schedule: {{schedule}}")
+    if fork_batch:
+        print(f"Fork-server mode: {{fork_batch}} calls per child process")
+        if tester.scheduler is not None:
+            print("Energy schedule is ignored in fork-server mode")
+    if corpus_dir:
+        loaded = tester.load_corpus(CorpusStore(corpus_dir))
+        print(f"Loaded {{loaded}} corpus inputs from {{corpus_dir}}")
+        if loaded and coverage is not None:
+            tester.replay_corpus()
+            print(f"Corpus replay restored {{coverage.edges}} coverage edges")
+    
+    if seed is None:
+        seed = int.from_bytes(os.urandom(4), 'little')
+    
+    feed = None
+    if stats_file or stats_fd is not None:
+        feed = StatsFeed(stats_file, stats_fd, stats_interval)
+    
+    if workers > 1:
+        print(f"Forking {{workers}} workers (base seed {{seed}})")
+        sys.stdout.flush()
+        totals = run_worker_pool(tester, iterations, workers, seed, worker_timeout, feed)
+        if feed is not None:
+            feed.write(totals, totals["completed"], kind="final")
+            feed.close()
+        print_summary(totals)
+        if tester.scheduler is not None:
+            print_budget_shares(totals)
+        print(f"Worker restarts: {{totals['restarts']}}")
+        if totals["gave_up"]:
+            print(f"Workers gave up: {{totals['gave_up']}}")
+        return not totals["buckets"] and not totals["gave_up"]
+    
+    random.seed(seed)
+    
+    def report_progress(i):
+        if i % 10 == 0:
+            print(f"Progress: {{i}}/{{iterations}} iterations completed")
+        if feed is not None and feed.due():
+            feed.write(tester.snapshot(), i + 1)
+    
+    fuzz_loop(tester, iterations, report_progress)
+    
+    # Вывод результатов
+    stats = tester.snapshot()
+    if feed is not None:
+        feed.write(stats, iterations, kind="final")
+        feed.close()
+    print_summary(stats)
+    if tester.scheduler is not None:
+        print_budget_shares(stats)
+    
+    return not tester.buckets
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Python Fuzzing Wrapper")
+    parser.add_argument("command", nargs="?", choices=("fuzz", "cmin", "minimize"), default="fuzz",
+                        help="fuzz (default), cmin to minimize the corpus directory, "
+                             "minimize to shrink a crash reproducer")
+    parser.add_argument("crash_file", nargs="?", help="Crash reproducer for the minimize command")
+    parser.add_argument("--iterations", type=int, default=100, help="Number of fuzzing iterations")
+    parser.add_argument("--coverage-guided", action="store_true",
+                        help="Keep inputs that reach new code and mutate them preferentially")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of forked worker processes")
+    parser.add_argument("--worker-timeout", type=float, default=60.0,
+                        help="Seconds without heartbeat before a worker is restarted")
+    parser.add_argument("--seed", type=int, help="Base random seed")
+    parser.add_argument("--timeout", type=float, default=CALL_TIMEOUT,
+                        help="Per-call time budget in seconds (0 disables hang detection)")
+    parser.add_argument("--corpus-dir", help="Persistent corpus directory (one subdirectory per function)")
+    parser.add_argument("--crash-dir", default=CRASH_DIR,
+                        help="Directory for crash reproducers (empty string disables)")
+    parser.add_argument("--jobs", type=int, help="Number of cmin/minimize processes (default: CPU count)")
+    parser.add_argument("--output", help="Where minimize writes the result (default: CRASH_FILE.min)")
+    parser.add_argument("--fork-server", type=int, nargs="?", const=1, default=0, metavar="N",
+                        help="Run every N calls (default 1) in a child forked from a warmed-up server")
+    parser.add_argument("--stats-file", help="Append periodic JSON-lines stats records to this file")
+    parser.add_argument("--stats-fd", type=int, help="Write JSON-lines stats records to this file descriptor")
+    parser.add_argument("--stats-interval", type=float, default=STATS_INTERVAL,
+                        help="Seconds between stats records")
+    parser.add_argument("--schedule", choices=SCHEDULES, default="round-robin",
+                        help="How iterations are distributed across target functions")
+    parser.add_argument("--dict", dest="dictionary_file", default=DICTIONARY_FILE,
+                        help="AFL/libFuzzer-style dictionary file")
+    parser.add_argument("--no-dict", action="store_true", help="Do not use a dictionary")
+    parser.add_argument("--bench-mutations", action="store_true",
+                        help="Run the mutation engine micro-benchmark and exit")
+    
+    args = parser.parse_args()
+    
+    if args.bench_mutations:
+        benchmark_mutations()
+        sys.exit(0)
+    
+    if args.command == "cmin":
+        if not args.corpus_dir:
+            parser.error("cmin requires --corpus-dir")
+        minimize_corpus(args.corpus_dir, jobs=args.jobs, timeout=args.timeout)
+        sys.exit(0)
+    
+    if args.command == "minimize":
+        if not args.crash_file:
+            parser.error("minimize requires a crash reproducer file")
+        result = minimize_crash(args.crash_file, jobs=args.jobs, timeout=args.timeout, output=args.output)
+        sys.exit(0 if result is not None else 1)
+    
+    success = run_fuzzing_session(
+        args.iterations,
+        coverage_guided=args.coverage_guided,
+        workers=args.workers,
+        seed=args.seed,
+        worker_timeout=args.worker_timeout,
+        dictionary_file=None if args.no_dict else args.dictionary_file,
+        timeout=args.timeout,
+        schedule=args.schedule,
+        corpus_dir=args.corpus_dir,
+        crash_dir=args.crash_dir,
+        fork_batch=args.fork_server,
+        stats_file=args.stats_file,
+        stats_fd=args.stats_fd,
+        stats_interval=args.stats_interval
+    )
     sys.exit(0 if success else 1)
 '''
     
     return code
 
 
+def generate_driver_code(project_path):
+    """Генерация libFuzzer-совместимого драйвера поверх TestOneInput обертки"""
+    code = f'''#!/usr/bin/env python3
+"""
+Auto-generated libFuzzer-style driver
+Project: {project_path.name}
+Generated by: PyFuzzWrap
+
+Usage:
+  python_fuzz_driver.py [flags] CORPUS_DIR...  fuzz, new inputs go to the first directory
+  python_fuzz_driver.py [flags] FILE...        replay inputs (each -runs times)
+  python_fuzz_driver.py [flags] -              persistent mode over stdin
+
+Flags: -runs=N -max_total_time=S -timeout=S -seed=N -target=NAME -dict=PATH
+       -artifact_prefix=PATH -max_len=N
+"""
+
+import sys
+import os
+import time
+import signal
+import struct
+import random
+import hashlib
+import traceback
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import python_fuzz_wrapper as harness
+
+FLAG_DEFAULTS = {{
+    "runs": -1,
+    "max_total_time": 0.0,
+    "timeout": harness.CALL_TIMEOUT,
+    "seed": 0,
+    "target": "",
+    "dict": harness.DICTIONARY_FILE,
+    "artifact_prefix": "",
+    "max_len": harness.MAX_INPUT_SIZE
+}}
+# Заголовок входа в постоянном режиме: длина данных, 4 байта little-endian
+FRAME_HEADER = struct.Struct('<I')
+# Интервал строк статуса в режиме фаззинга (секунды)
+STATUS_INTERVAL = 3.0
+
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+def parse_flags(argv):
+    """Разбор флагов вида -name=value и позиционных путей"""
+    flags = dict(FLAG_DEFAULTS)
+    paths = []
+    for arg in argv:
+        if arg.startswith('-') and '=' in arg:
+            name, value = arg[1:].split('=', 1)
+            if name not in flags:
+                log(f"WARNING: unknown flag -{{name}}, ignored")
+                continue
+            try:
+                flags[name] = type(FLAG_DEFAULTS[name])(value)
+            except ValueError:
+                log(f"WARNING: bad value for flag -{{name}}: {{value!r}}, ignored")
+        else:
+            paths.append(arg)
+    return flags, paths
+
+
+class Driver:
+    """Выполнение входов в одном процессе с учетом бюджета и артефактов"""
+    
+    def __init__(self, flags):
+        self.flags = flags
+        self.runs = 0
+        self.started = time.monotonic()
+        timeout = flags["timeout"]
+        self.watchdog = (harness.HangWatchdog(timeout)
+                         if timeout > 0 and hasattr(signal, "setitimer") else None)
+    
+    def budget_left(self):
+        runs = self.flags["runs"]
+        if runs >= 0 and self.runs >= runs:
+            return False
+        limit = self.flags["max_total_time"]
+        return not limit or time.monotonic() - self.started < limit
+    
+    def execute(self, data):
+        """Один вызов TestOneInput; падение или зависание завершает процесс"""
+        watchdog = self.watchdog
+        if watchdog is not None:
+            watchdog.call += 1
+        try:
+            harness.TestOneInput(data)
+        except harness.CallTimeout:
+            self.report("timeout", data)
+        except Exception:
+            self.report("crash", data)
+        if watchdog is not None:
+            watchdog.call += 1
+        self.runs += 1
+    
+    def report(self, kind, data):
+        """Сохранение входа-репродьюсера в стиле libFuzzer и выход"""
+        traceback.print_exc()
+        artifact = f"{{self.flags['artifact_prefix']}}{{kind}}-{{hashlib.sha1(data).hexdigest()}}"
+        Path(artifact).write_bytes(data)
+        log(f"==ERROR: {{kind}} in target after {{self.runs}} runs; test unit written to {{artifact}}")
+        sys.exit(1)
+    
+    def replay(self, files):
+        """Прогон отдельных файлов-входов"""
+        repeats = max(self.flags["runs"], 1)
+        for path in files:
+            data = Path(path).read_bytes()
+            log(f"Running: {{path}}")
+            started = time.monotonic()
+            for _ in range(repeats):
+                self.execute(data)
+            log(f"Executed {{path}} in {{(time.monotonic() - started) * 1000:.0f}} ms")
+    
+    def serve_stdin(self):
+        """Постоянный режим: входы с префиксом длины на stdin, по байту статуса на stdout"""
+        stdin = sys.stdin.buffer
+        stdout = sys.stdout.buffer
+        while self.budget_left():
+            header = stdin.read(FRAME_HEADER.size)
+            if len(header) < FRAME_HEADER.size:
+                break
+            self.execute(stdin.read(FRAME_HEADER.unpack(header)[0]))
+            stdout.write(bytes(1))
+            stdout.flush()
+        log(f"Done {{self.runs}} runs from stdin")
+    
+    def fuzz(self, corpus_dirs, dictionary):
+        """Фаззинг с покрытием: новые входы сохраняются в первый каталог корпуса"""
+        max_len = self.flags["max_len"]
+        corpus = [
+            path.read_bytes()[:max_len]
+            for directory in corpus_dirs
+            for path in sorted(Path(directory).iterdir()) if path.is_file()
+        ]
+        log(f"INFO: {{len(corpus)}} files found in {{', '.join(corpus_dirs)}}")
+        corpus = corpus or [b""]
+        output_dir = Path(corpus_dirs[0])
+        
+        coverage = harness.CoverageMap()
+        mutator = harness.Mutator(max_size=max_len, dictionary=dictionary)
+        coverage.start()
+        try:
+            for data in corpus:
+                coverage.prev = 0
+                self.execute(data)
+            log(f"#{{self.runs}}\\tINITED cov: {{coverage.edges}} corp: {{len(corpus)}}")
+            
+            last_status = time.monotonic()
+            while self.budget_left():
+                other = random.choice(corpus) if random.random() < harness.SPLICE_PROBABILITY else None
+                data = bytes(mutator.mutate_buffer(random.choice(corpus), other))
+                edges_before = coverage.edges
+                coverage.prev = 0
+                self.execute(data)
+                if coverage.edges != edges_before:
+                    corpus.append(data)
+                    (output_dir / hashlib.sha1(data).hexdigest()).write_bytes(data)
+                    log(f"#{{self.runs}}\\tNEW    cov: {{coverage.edges}} corp: {{len(corpus)}} len: {{len(data)}}")
+                
+                now = time.monotonic()
+                if now - last_status >= STATUS_INTERVAL:
+                    last_status = now
+                    rate = self.runs / (now - self.started)
+                    log(f"#{{self.runs}}\\tpulse  cov: {{coverage.edges}} corp: {{len(corpus)}} exec/s: {{rate:.0f}}")
+        finally:
+            coverage.stop()
+        log(f"Done {{self.runs}} runs in {{time.monotonic() - self.started:.0f}} second(s)")
+
+
+def main(argv):
+    flags, paths = parse_flags(argv)
+    if flags["target"]:
+        os.environ["FUZZ_TARGET"] = flags["target"]
+    seed = flags["seed"] or int.from_bytes(os.urandom(4), 'little')
+    random.seed(seed)
+    log(f"INFO: Seed: {{seed}}")
+    
+    # Словарь влияет на декодирование входов, поэтому грузится во всех режимах
+    dictionary = harness.load_dictionary(flags["dict"]) if flags["dict"] else []
+    harness.use_dictionary(dictionary)
+    log(f"INFO: {{len(harness.entry_targets())}} targets, {{len(dictionary)}} dictionary tokens")
+    
+    driver = Driver(flags)
+    if driver.watchdog is not None:
+        driver.watchdog.start()
+    try:
+        if paths == ['-']:
+            driver.serve_stdin()
+        elif any(os.path.isdir(path) for path in paths):
+            driver.fuzz([path for path in paths if os.path.isdir(path)], dictionary)
+        elif paths:
+            driver.replay(paths)
+        else:
+            log(__doc__)
+            return 2
+    finally:
+        if driver.watchdog is not None:
+            driver.watchdog.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
+'''
+    
+    return code
+
+
 def main():
     parser = argparse.ArgumentParser(description="PyFuzzWrap - Python Fuzzing Wrapper Generator")
     parser.add_argument("project_path", help="Path to Python project")
     parser.add_argument("--functions", nargs="+", help="Specific functions to target")
     parser.add_argument("--output", help="Output directory for wrapper")
+    parser.add_argument("--jobs", type=int, help="Number of analysis processes (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Disable incremental analysis cache")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="Split targets into K self-contained harnesses plus a shards.json manifest")
+    parser.add_argument("--top", type=int, help="Emit only the N targets with the highest static score")
     
     args = parser.parse_args()
     
@@ -202,12 +3336,31 @@ def main():
         result = generate_fuzzing_wrapper(
             args.project_path, 
             args.functions, 
-            args.output
+            args.output,
+            jobs=args.jobs,
+            use_cache=not args.no_cache,
+            shards=args.shards,
+            top=args.top
         )
         
         print("Fuzzing wrapper generated successfully!")
-        print(f"Wrapper file: {result['wrapper_file']}")
+        if "manifest_file" in result:
+            print(f"Manifest: {result['manifest_file']}")
+            for shard in result["shards"]:
+                print(f"  - {shard['wrapper']}: {len(shard['modules'])} modules, "
+                      f"{shard['functions']} functions, weight {shard['weight']}")
+        else:
+            print(f"Wrapper file: {result['wrapper_file']}")
+            print(f"Driver file: {result['driver_file']}")
+            print(f"Dictionary: {result['dictionary_file']} ({result['dictionary_tokens']} tokens)")
         print(f"Functions found: {result['functions_found']}")
+        print(f"Files analyzed: {result['files_analyzed']}")
+        print(f"Cache hit rate: {result['cache_hit_rate']:.1%} "
+              f"({result['cache_hits']}/{result['files_analyzed']})")
+        if result['top_targets']:
+            print("Top targets by static score:")
+            for name, score in result['top_targets']:
+                print(f"  - {name}: {score}")
         
     except Exception as e:
         print(f"Error: {e}")
@@ -9,21 +9,131 @@ import sys
 import shutil
 import argparse
 import os
+import time
+import hashlib
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import json
 
+# Версия трансформера: при изменении манифест сбрасывается и все файлы пересобираются
+TRANSFORMER_VERSION = 1
+MANIFEST_FILE_NAME = ".afl_manifest.json"
+REPORT_FILE_NAME = "transformation_report.jsonl"
+# Меньше файлов - пул процессов не окупается
+PARALLEL_THRESHOLD = 32
+# Определение метода: def x, def self.x, предикаты x?, x! и сеттеры x=,
+# в том числе после модификатора видимости (private def x)
+METHOD_PATTERN = re.compile(
+    r'^[ \t]*(?:(?:private|protected|public|module_function)[ \t]+)?'
+    r'def[ \t]+(self\.)?([A-Za-z_]\w*[?!=]?)(?:[ \t]*\(([^)]*)\))?',
+    re.MULTILINE
+)
+NEWLINE_PATTERN = re.compile('\n')
+# Точка входа и конструкции, определяющие границы цикла persistent-режима
+CMD_PARSER_PATTERN = re.compile(r'CommandParser::CmdParser\.new\(ARGV\)')
+ARGV_PATTERN = re.compile(r'\bARGV\b')
+MAIN_GUARD_PATTERN = re.compile(r'if\s+(?:__FILE__\s*==\s*\$(?:0|PROGRAM_NAME)'
+                                r'|\$(?:0|PROGRAM_NAME)\s*==\s*__FILE__)\s*$')
+BLOCK_END_PATTERN = re.compile(r'end\b')
+DEFINITION_PATTERN = re.compile(r'(?:class|module|def)\b|[A-Z]\w*\s*(?:\|\|)?=(?!=)')
+GLOBAL_ASSIGN_PATTERN = re.compile(r'(?<![\w$])\$([A-Za-z_]\w*)\s*(?:\|\||&&|[-+*/])?=(?![=~])')
+# Глобальные переменные интерпретатора, которые между итерациями не восстанавливаются
+RUBY_SPECIAL_GLOBALS = {'stdin', 'stdout', 'stderr', 'PROGRAM_NAME', 'VERBOSE', 'DEBUG',
+                        'LOAD_PATH', 'LOADED_FEATURES', 'FILENAME', 'SAFE'}
 
-def transform_ruby_code(input_code):
-    """
-    Универсальное добавление поддержки AFL в Ruby-скрипт.
-    """
+
+def add_afl_require(input_code):
+    """Подключение afl: после блока лицензии или в начало файла"""
     # Проверяем, есть ли блок лицензии
     license_pattern = r'(Licensed under the Apache License, Version [\d.]+.*?# limitations under the License\.\s*#[-]+ #)'
     if re.search(license_pattern, input_code, re.DOTALL):
-        input_code = re.sub(license_pattern, r'\1\nrequire "afl"\n', input_code, flags=re.DOTALL)
-    else:
-        # Если лицензии нет, добавляем require "afl" в начало
-        input_code = 'require "afl"\n' + input_code
+        return re.sub(license_pattern, r'\1\nrequire "afl"\n', input_code, flags=re.DOTALL)
+    # Если лицензии нет, добавляем require "afl" в начало
+    return 'require "afl"\n' + input_code
+
+
+def _entry_line(lines):
+    """Номер строки точки входа: разбор CmdParser или первое использование ARGV"""
+    for pattern in (CMD_PARSER_PATTERN, ARGV_PATTERN):
+        for index, line in enumerate(lines):
+            if not line.lstrip().startswith('#') and pattern.search(line):
+                return index
+    return None
+
+
+def persistent_ruby_code(input_code, iterations):
+    """Обертка точки входа в цикл AFL.loop(N) для persistent-режима.
+
+    В цикл попадает код от точки входа до конца файла (или до __END__),
+    а если точка входа внутри `if __FILE__ == $0` - до конца этого блока.
+    Перед каждой итерацией восстанавливаются глобальные переменные,
+    которым скрипт присваивает значения, и ARGV; exit завершает только
+    текущую итерацию. Возвращает (код, None) или (None, причина отказа).
+    """
+    lines = input_code.splitlines(keepends=True)
+    end = next((index for index, line in enumerate(lines) if line.rstrip() == '__END__'), len(lines))
+    entry = _entry_line(lines[:end])
+    if entry is None:
+        return None, "no ARGV entry point"
+    
+    indent = lines[entry][:len(lines[entry]) - len(lines[entry].lstrip())]
+    if indent:
+        guard = next((index for index in range(entry - 1, -1, -1)
+                      if lines[index].strip() and not lines[index][0].isspace()), None)
+        if guard is None or not MAIN_GUARD_PATTERN.match(lines[guard]):
+            return None, "entry point is inside a method or block"
+        first = next(index for index in range(guard + 1, entry + 1) if lines[index].strip())
+        if not lines[first].startswith(indent) or lines[first][len(indent)].isspace():
+            return None, "entry point is nested inside the main guard"
+        end = next((index for index in range(entry + 1, end) if BLOCK_END_PATTERN.match(lines[index])), None)
+        if end is None:
+            return None, "main guard is not closed"
+    
+    body = lines[entry:end]
+    for line in body:
+        if line.startswith(indent) and DEFINITION_PATTERN.match(line[len(indent):]):
+            return None, "defines classes, methods or constants after the entry point"
+    if body and not body[-1].endswith('\n'):
+        body[-1] += '\n'
+    
+    names = sorted({name for name in GLOBAL_ASSIGN_PATTERN.findall(input_code)
+                    if name not in RUBY_SPECIAL_GLOBALS})
+    loop = [f"{indent}AFL.init\n"]
+    if names:
+        saved = ', '.join(f'"${name}" => afl_copy.(${name})' for name in names)
+        loop += [
+            f"{indent}afl_copy = ->(value) {{ Marshal.load(Marshal.dump(value)) rescue value }}\n",
+            f"{indent}afl_globals = {{ {saved} }}\n"
+        ]
+    loop.append(f"{indent}while AFL.loop({iterations})\n")
+    if names:
+        loop.append(f'{indent}  afl_globals.each {{ |name, value| eval("#{{name}} = afl_copy.(value)") }}\n')
+    loop += [
+        f"{indent}  afl_input = $stdin.gets\n",
+        f"{indent}  ARGV.replace(afl_input.to_s.split)\n",
+        f"{indent}  begin\n",
+        *body,
+        f"{indent}  rescue SystemExit\n",
+        f"{indent}  end\n",
+        f"{indent}end\n"
+    ]
+    return ''.join(lines[:entry] + loop + lines[end:]), None
+
+
+def instrument_ruby_code(input_code, persistent=0):
+    """Трансформация с описанием результата: (код, {'persistent', 'reason'}).
+
+    Если persistent-режим запрошен, но точку входа нельзя безопасно
+    обернуть в AFL.loop, применяется обычная трансформация с AFL.init.
+    """
+    reason = None
+    if persistent:
+        code, reason = persistent_ruby_code(input_code, persistent)
+        if code is not None:
+            return add_afl_require(code), {'persistent': True, 'reason': None}
+    
+    input_code = add_afl_require(input_code)
     
     # Вставка кода инициализации AFL перед разбором аргументов
     afl_init_code = '''\nAFL.init\nafl_input = $stdin.gets\nARGV.replace(afl_input.split)\n'''
@@ -34,7 +144,76 @@ def transform_ruby_code(input_code):
         # Если не найден разбор аргументов, добавляем перед первым `ARGV`
         input_code = re.sub(r'ARGV', afl_init_code + 'ARGV', input_code, count=1)
     
-    return input_code
+    return input_code, {'persistent': False, 'reason': reason}
+
+
+def transform_ruby_code(input_code, persistent=0):
+    """
+    Универсальное добавление поддержки AFL в Ruby-скрипт.
+    """
+    return instrument_ruby_code(input_code, persistent)[0]
+
+
+def line_index(content):
+    """Смещения всех переводов строк; номер строки позиции - через bisect"""
+    return [match.start() for match in NEWLINE_PATTERN.finditer(content)]
+
+
+def extract_ruby_methods(content):
+    """Методы Ruby-файла за один проход: имя, строка и параметры"""
+    newlines = line_index(content)
+    methods = []
+    for match in METHOD_PATTERN.finditer(content):
+        singleton, method_name, params = match.groups()
+        methods.append({
+            'name': f"self.{method_name}" if singleton else method_name,
+            'line': bisect_right(newlines, match.start()) + 1,
+            'params': [p.strip() for p in params.split(',') if p.strip()] if params else []
+        })
+    return methods, len(newlines) + 1
+
+
+def _extract_methods_quadratic(content):
+    """Прежний способ: номер строки пересчитывается от начала файла (для сравнения)"""
+    methods = []
+    for match in re.finditer(r'def\s+(\w+)(?:\(([^)]*)\))?', content, re.MULTILINE):
+        params = match.group(2) if match.group(2) else ""
+        methods.append({
+            'name': match.group(1),
+            'line': content[:match.start()].count('\n') + 1,
+            'params': [p.strip() for p in params.split(',') if p.strip()]
+        })
+    return methods
+
+
+def benchmark_method_extraction(methods=10000):
+    """Сравнение времени извлечения методов на большом синтетическом файле"""
+    blocks = []
+    for index in range(methods):
+        kind = index % 4
+        if kind == 0:
+            blocks.append(f"  def method_{index}(a, b = {index})\n    a + b\n  end\n")
+        elif kind == 1:
+            blocks.append(f"  def self.build_{index}(opts)\n    new(opts)\n  end\n")
+        elif kind == 2:
+            blocks.append(f"  def valid_{index}?\n    @value > {index}\n  end\n")
+        else:
+            blocks.append(f"  def value_{index}=(value)\n    @value = value\n  end\n")
+    content = "class Generated\n" + "\n".join(blocks) + "end\n"
+    
+    started = time.perf_counter()
+    legacy = _extract_methods_quadratic(content)
+    legacy_time = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    found, _ = extract_ruby_methods(content)
+    indexed_time = time.perf_counter() - started
+    
+    print(f"Synthetic file: {methods} methods, {len(content)} bytes")
+    print(f"  quadratic line counting: {legacy_time:.3f}s ({len(legacy)} methods)")
+    print(f"  line-offset index:       {indexed_time:.3f}s ({len(found)} methods)")
+    print(f"  speedup: {legacy_time / max(indexed_time, 1e-9):.1f}x")
+    return {'legacy_seconds': legacy_time, 'indexed_seconds': indexed_time}
 
 
 def analyze_ruby_files(project_path):
@@ -49,25 +228,14 @@ def analyze_ruby_files(project_path):
                 content = f.read()
                 
             # Поиск методов
-            method_pattern = r'def\s+(\w+)(?:\(([^)]*)\))?'
-            methods = []
-            for match in re.finditer(method_pattern, content, re.MULTILINE):
-                method_name = match.group(1)
-                params = match.group(2) if match.group(2) else ""
-                line_num = content[:match.start()].count('\n') + 1
-                
-                methods.append({
-                    'name': method_name,
-                    'line': line_num,
-                    'params': [p.strip() for p in params.split(',') if p.strip()]
-                })
+            methods, lines = extract_ruby_methods(content)
             
             files_info.append({
                 'file': str(rb_file.relative_to(project_path)),
                 'full_path': str(rb_file),
                 'methods': methods,
                 'size': len(content),
-                'lines': content.count('\n') + 1
+                'lines': lines
             })
             
         except Exception as e:
@@ -76,8 +244,118 @@ def analyze_ruby_files(project_path):
     return files_info
 
 
-def transform_ruby_project(project_path, output_dir=None, target_files=None):
-    """Трансформация всех Ruby файлов в проекте для поддержки AFL"""
+def load_manifest(manifest_file):
+    """Загрузка манифеста трансформации (пустой при смене версии трансформера)"""
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    
+    if manifest.get('version') != TRANSFORMER_VERSION:
+        return {}
+    return manifest.get('files', {})
+
+
+def save_manifest(manifest_file, entries):
+    """Атомарное сохранение манифеста"""
+    tmp_file = Path(str(manifest_file) + ".tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({'version': TRANSFORMER_VERSION, 'files': entries}, f)
+    os.replace(tmp_file, manifest_file)
+
+
+def _output_matches(output_file, entry):
+    """Выходной файл на месте и не менялся после записи"""
+    try:
+        st = os.stat(output_file)
+    except OSError:
+        return False
+    return st.st_mtime_ns == entry['output_mtime'] and st.st_size == entry['output_size']
+
+
+def _transform_file_job(job):
+    """Задача пула: одно чтение файла, анализ методов и трансформация.
+
+    Если хеш исходника и выходной файл совпали с манифестом, файл
+    пропускается без повторной записи.
+    """
+    full_path, output_file, known, persistent = job
+    try:
+        with open(full_path, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        if known and known['source_sha256'] == digest and _output_matches(output_file, known):
+            return 'skipped', dict(known, source_mtime=os.stat(full_path).st_mtime_ns), None
+        
+        content = raw.decode('utf-8')
+        methods, _ = extract_ruby_methods(content)
+        transformed, info = instrument_ruby_code(content, persistent)
+        transformed = transformed.encode('utf-8')
+        
+        Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+        with open(output_file, 'wb') as f:
+            f.write(transformed)
+        
+        st = os.stat(full_path)
+        out_st = os.stat(output_file)
+        return 'success', {
+            'source_sha256': digest,
+            'source_mtime': st.st_mtime_ns,
+            'source_size': st.st_size,
+            'output_sha256': hashlib.sha256(transformed).hexdigest(),
+            'output_mtime': out_st.st_mtime_ns,
+            'output_size': out_st.st_size,
+            'methods_count': len(methods),
+            'persistent_mode': persistent,
+            'persistent': info['persistent'],
+            'persistent_reason': info['reason']
+        }, None
+    except Exception as e:
+        return 'error', None, str(e)
+
+
+def read_partial_report(report_file):
+    """Файлы, уже обработанные прерванным запуском: {путь: запись манифеста}.
+
+    Если отчет завершен итоговой строкой, продолжать нечего. Оборванная
+    последняя строка отрезается, чтобы дописывать отчет с целой строки.
+    """
+    try:
+        with open(report_file, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return {}
+    
+    complete = data[:data.rfind(b'\n') + 1]
+    done = {}
+    for line in complete.splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record.get('type') == 'summary':
+            return {}
+        if record.get('type') == 'file' and record.get('status') in ('success', 'skipped') and record.get('entry'):
+            done[record['file']] = record['entry']
+    
+    if len(complete) != len(data):
+        with open(report_file, 'r+b') as f:
+            f.truncate(len(complete))
+    return done
+
+
+def transform_ruby_project(project_path, output_dir=None, target_files=None, jobs=None, force=False,
+                           persistent=0, resume=False):
+    """Трансформация всех Ruby файлов в проекте для поддержки AFL.
+
+    Файлы обрабатываются в пуле процессов; манифест в выходной директории
+    хранит хеши исходника и результата, поэтому при повторном запуске
+    неизмененные файлы пропускаются. С persistent=N точка входа
+    оборачивается в AFL.loop(N), и отчет отмечает, где это удалось.
+    Отчет JSONL пишется по мере обработки файлов (строка на файл и
+    итоговая строка); resume=True продолжает прерванный запуск по нему.
+    """
     project_path = Path(project_path)
     
     if not project_path.exists():
@@ -91,79 +369,141 @@ def transform_ruby_project(project_path, output_dir=None, target_files=None):
     
     output_dir.mkdir(exist_ok=True)
     
-    # Анализ и трансформация файлов
-    files_info = analyze_ruby_files(project_path)
-    transformed_files = []
-    
-    for file_info in files_info:
-        # Если указаны конкретные файлы, обрабатываем только их
-        if target_files and file_info['file'] not in target_files:
-            continue
-            
-        try:
-            # Читаем исходный файл
-            with open(file_info['full_path'], 'r', encoding='utf-8') as f:
-                original_code = f.read()
-            
-            # Применяем трансформацию
-            transformed_code = transform_ruby_code(original_code)
-            
-            # Создаем структуру директорий в выходной папке
-            rel_path = Path(file_info['file'])
-            output_file = output_dir / rel_path
-            output_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Записываем трансформированный файл
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(transformed_code)
-            
-            transformed_files.append({
-                'original': file_info['full_path'],
-                'transformed': str(output_file),
-                'methods_count': len(file_info['methods']),
-                'status': 'success'
-            })
-            
-            print(f"Transformed: {file_info['file']} -> {output_file}")
-            
-        except Exception as e:
-            print(f"Error transforming {file_info['file']}: {e}")
-            transformed_files.append({
-                'original': file_info['full_path'],
-                'transformed': None,
-                'methods_count': len(file_info['methods']),
-                'status': 'error',
-                'error': str(e)
-            })
+    # Поиск Ruby файлов (результаты прошлых запусков не трансформируем)
+    output_root = output_dir.resolve()
+    ruby_files = sorted(
+        rb_file for rb_file in project_path.rglob("*.rb")
+        if output_root not in rb_file.resolve().parents
+    )
     
-    # Создание отчета
-    report = {
+    manifest_file = output_dir / MANIFEST_FILE_NAME
+    manifest = {} if force else load_manifest(manifest_file)
+    report_file = output_dir / REPORT_FILE_NAME
+    resumed = read_partial_report(report_file) if resume else {}
+    report_stream = open(report_file, 'a' if resumed else 'w', encoding='utf-8', buffering=1)
+    report_stream.write(json.dumps({
+        'type': 'resume' if resumed else 'start',
         'project_path': str(project_path),
         'output_dir': str(output_dir),
-        'total_files': len(files_info),
-        'transformed_files': len([f for f in transformed_files if f['status'] == 'success']),
-        'failed_files': len([f for f in transformed_files if f['status'] == 'error']),
-        'files': transformed_files,
-        'summary': {
-            'total_methods': sum(f['methods_count'] for f in transformed_files),
-            'files_processed': len(transformed_files)
+        'total_files': len(ruby_files),
+        'persistent_iterations': persistent
+    }) + '\n')
+    
+    entries = {}
+    counts = {status: 0 for status in ('success', 'skipped', 'error', 'resumed')}
+    totals = {'methods': 0, 'persistent': 0}
+    
+    def finish(rel_path, status, entry, error):
+        """Учет результата файла и строка отчета"""
+        record = {
+            'type': 'file',
+            'file': rel_path,
+            'original': str(project_path / rel_path),
+            'transformed': str(output_dir / rel_path) if entry else None,
+            'methods_count': entry['methods_count'] if entry else 0,
+            'status': status
         }
-    }
+        if persistent and entry:
+            record['persistent'] = entry['persistent']
+            record['persistent_reason'] = entry['persistent_reason']
+        if status == 'error':
+            record['error'] = error
+            print(f"Error transforming {rel_path}: {error}")
+        else:
+            record['entry'] = entries[rel_path] = entry
+            totals['methods'] += entry['methods_count']
+            totals['persistent'] += bool(persistent and entry['persistent'])
+            if status == 'success':
+                print(f"Transformed: {rel_path} -> {record['transformed']}")
+            if persistent and not entry['persistent']:
+                print(f"  - not persistent: {rel_path}: {entry['persistent_reason']}")
+        counts[status] += 1
+        report_stream.write(json.dumps(record) + '\n')
     
-    # Сохранение отчета
-    report_file = output_dir / "transformation_report.json"
-    with open(report_file, 'w', encoding='utf-8') as f:
-        json.dump(report, f, indent=2)
+    pending = []
+    try:
+        for rb_file in ruby_files:
+            rel_path = str(rb_file.relative_to(project_path))
+            # Если указаны конкретные файлы, обрабатываем только их
+            if target_files and rel_path not in target_files:
+                if rel_path in manifest:
+                    entries[rel_path] = manifest[rel_path]
+                continue
+            # Уже обработан прерванным запуском в том же режиме
+            done = resumed.get(rel_path)
+            if done and done.get('persistent_mode', 0) == persistent:
+                entries[rel_path] = done
+                counts['resumed'] += 1
+                totals['methods'] += done['methods_count']
+                totals['persistent'] += bool(persistent and done['persistent'])
+                continue
+            
+            output_file = output_dir / rel_path
+            known = manifest.get(rel_path)
+            if known and known.get('persistent_mode', 0) != persistent:
+                known = None
+            try:
+                st = rb_file.stat()
+            except OSError as e:
+                finish(rel_path, 'error', None, str(e))
+                continue
+            
+            # Совпали метаданные исходника и результата - файл даже не читаем
+            if (known and known['source_mtime'] == st.st_mtime_ns and known['source_size'] == st.st_size
+                    and _output_matches(output_file, known)):
+                finish(rel_path, 'skipped', known, None)
+                continue
+            pending.append((rel_path, (str(rb_file), str(output_file), known, persistent)))
+        
+        if jobs is None:
+            jobs = os.cpu_count() or 1
+        job_args = [job for _, job in pending]
+        if jobs > 1 and len(pending) >= PARALLEL_THRESHOLD:
+            chunksize = max(1, len(pending) // (jobs * 8))
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                for (rel_path, _), outcome in zip(pending, executor.map(_transform_file_job, job_args,
+                                                                         chunksize=chunksize)):
+                    finish(rel_path, *outcome)
+        else:
+            for rel_path, job in pending:
+                finish(rel_path, *_transform_file_job(job))
+        
+        save_manifest(manifest_file, entries)
+        
+        report = {
+            'type': 'summary',
+            'project_path': str(project_path),
+            'output_dir': str(output_dir),
+            'total_files': len(ruby_files),
+            'transformed_files': counts['success'],
+            'skipped_files': counts['skipped'],
+            'resumed_files': counts['resumed'],
+            'failed_files': counts['error'],
+            'summary': {
+                'total_methods': totals['methods'],
+                'files_processed': counts['success'] + counts['skipped'] + counts['error']
+            }
+        }
+        if persistent:
+            report['persistent_iterations'] = persistent
+            report['persistent_files'] = totals['persistent']
+        report_stream.write(json.dumps(report) + '\n')
+    finally:
+        report_stream.close()
     
     print(f"\nTransformation completed!")
     print(f"Output directory: {output_dir}")
-    print(f"Files transformed: {report['transformed_files']}/{report['total_files']}")
+    print(f"Files transformed: {report['transformed_files']}/{report['total_files']} "
+          f"(skipped unchanged: {report['skipped_files']}, resumed: {report['resumed_files']}, "
+          f"failed: {report['failed_files']})")
+    if persistent:
+        print(f"Persistent mode (AFL.loop({persistent})): {report['persistent_files']} files")
     print(f"Report saved: {report_file}")
     
     return report
 
 
-def transform_single_file(input_filename, output_filename=None):
+def transform_single_file(input_filename, output_filename=None, persistent=0):
     """Трансформация отдельного файла (оригинальная логика)"""
     # Если файл не имеет расширения .rb, создаем копию с .rb
     if not input_filename.endswith(".rb"):
@@ -189,7 +529,9 @@ def transform_single_file(input_filename, output_filename=None):
         output_filename = "afl_" + os.path.basename(input_filename)
 
     # Применяем трансформацию
-    transformed_code = transform_ruby_code(ruby_code)
+    transformed_code, info = instrument_ruby_code(ruby_code, persistent)
+    if persistent and not info['persistent']:
+        print(f"Persistent mode not applied: {info['reason']}")
 
     # Записываем результат в новый файл
     with open(output_filename, "w", encoding="utf-8") as file:
@@ -200,20 +542,35 @@ def transform_single_file(input_filename, output_filename=None):
     return {
         'input_file': input_filename,
         'output_file': output_filename,
-        'status': 'success'
+        'status': 'success',
+        'persistent': info['persistent']
     }
 
 
 def main():
     parser = argparse.ArgumentParser(description="AFL Ruby Transformer")
-    parser.add_argument("input", help="Path to Ruby file or project directory")
+    parser.add_argument("input", nargs='?', help="Path to Ruby file or project directory")
     parser.add_argument("output", nargs='?', help="Output file or directory")
     parser.add_argument("--project", action="store_true", help="Process entire project directory")
     parser.add_argument("--files", nargs="+", help="Specific files to transform (for project mode)")
     parser.add_argument("--analyze-only", action="store_true", help="Only analyze, don't transform")
+    parser.add_argument("--jobs", type=int, help="Number of transformation processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Ignore the manifest and re-transform every file")
+    parser.add_argument("--persistent", type=int, default=0, metavar="N",
+                        help="Wrap the ARGV entry point in AFL.loop(N) (persistent mode)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted project run using its partial JSONL report")
+    parser.add_argument("--bench-analysis", type=int, nargs='?', const=10000, metavar="METHODS",
+                        help="Compare method extraction speed on a synthetic file and exit")
     
     args = parser.parse_args()
     
+    if args.bench_analysis:
+        benchmark_method_extraction(args.bench_analysis)
+        return
+    if not args.input:
+        parser.error("input is required")
+    
     try:
         if args.project or os.path.isdir(args.input):
             # Режим обработки проекта
@@ -226,12 +583,13 @@ def main():
                         params = ', '.join(method['params']) if method['params'] else ''
                         print(f"    - {method['name']}({params}) at line {method['line']}")
             else:
-                result = transform_ruby_project(args.input, args.output, args.files)
+                result = transform_ruby_project(args.input, args.output, args.files, args.jobs, args.force,
+                                                args.persistent, args.resume)
                 print(f"\nProject transformation completed!")
                 return result
         else:
             # Режим обработки отдельного файла (оригинальная логика)
-            result = transform_single_file(args.input, args.output)
+            result = transform_single_file(args.input, args.output, args.persistent)
             return result
             
     except Exception as e:
@@ -241,7 +599,8 @@ def main():
 
 if __name__ == "__main__":
     # Поддержка оригинального интерфейса для обратной совместимости
-    if len(sys.argv) >= 2 and not any(arg.startswith('--') for arg in sys.argv[1:]):
+    if (len(sys.argv) >= 2 and not any(arg.startswith('--') for arg in sys.argv[1:])
+            and not os.path.isdir(sys.argv[1])):
         # Оригинальный интерфейс: python transform.py input_file [output_file]
         input_filename = sys.argv[1]
         output_filename = sys.argv[2] if len(sys.argv) > 2 else None